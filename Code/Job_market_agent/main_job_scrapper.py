@@ -2,16 +2,42 @@
 
 import os
 import re
-import io
+import sys
+import gzip
+import hashlib
 import json
 import time
+import tempfile
 import argparse
+import atexit
+import threading
+import functools
 import logging
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Iterable, Tuple
-from urllib.parse import urljoin, urlparse
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from html import unescape
+from itertools import chain
+from queue import SimpleQueue
+from dataclasses import dataclass, field, fields, replace
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+WRITE_CHUNK_BYTES = 1 << 20
+SPOOL_BYTES = 8 << 20  # in-memory spool limit, also the multipart part size
+
+def json_bytes(obj, indent: bool = False) -> bytes:
+    """UTF-8 JSON without ASCII escaping; uses orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
 
 # ======== AWS S3 storage ==========
 class S3Storage:
@@ -20,23 +46,47 @@ class S3Storage:
       links/links_all_all.jsonl
       raw/raw_all_all.jsonl
       extracted/extracted_all_all.jsonl
+    JSONL bodies are gzip-compressed (key suffix .gz) unless compress=False.
     """
-    def __init__(self, bucket: str, region: str | None = None):
+    def __init__(self, bucket: str, region: str | None = None, compress: bool = True):
         try:
             import boto3
+            from boto3.s3.transfer import TransferConfig
         except ImportError:
             raise SystemExit("boto3 is required for S3 mode. Install with: pip install boto3")
         self.bucket = bucket
+        self.compress = compress
         self.s3 = boto3.client("s3", region_name=region)
+        self.transfer = TransferConfig(multipart_threshold=SPOOL_BYTES, multipart_chunksize=SPOOL_BYTES,
+                                       use_threads=True)
 
     def _put_lines(self, key: str, lines_iter) -> str:
-        buf = io.StringIO()
+        # Encode (and gzip) line by line into a buffer that spills to disk past SPOOL_BYTES,
+        # so a multi-GB raw dump never sits in memory
+        buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES, mode="w+b")
+        out = gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=6) if self.compress else buf
+        # Coalesce records into ~1 MiB chunks instead of two small writes per line
+        pending = bytearray()
         for line in lines_iter:
-            buf.write(line)
-            if not line.endswith("\n"):
-                buf.write("\n")
-        body = buf.getvalue().encode("utf-8")
-        self.s3.put_object(Bucket=self.bucket, Key=key, Body=body)
+            if isinstance(line, str):
+                line = line.encode("utf-8")
+            pending += line
+            if not line.endswith(b"\n"):
+                pending += b"\n"
+            if len(pending) >= WRITE_CHUNK_BYTES:
+                out.write(pending)
+                pending.clear()
+        out.write(pending)
+        extra = {"ContentType": "application/x-ndjson"}
+        if self.compress:
+            # Raw HTML compresses ~8-15x, which dominates PUT size and storage cost
+            out.close()
+            key += ".gz"
+            extra["ContentEncoding"] = "gzip"
+        buf.seek(0)
+        # upload_fileobj switches to a parallel multipart upload for large bodies
+        with buf:
+            self.s3.upload_fileobj(buf, self.bucket, key, ExtraArgs=extra, Config=self.transfer)
         return f"s3://{self.bucket}/{key}"
 
     def write_links(self, links: Dict[str, List[str]], role: str, city: str) -> str:
@@ -44,28 +94,54 @@ class S3Storage:
         def gen():
             for source, urls in links.items():
                 for u in urls:
-                    yield json.dumps({"source": source, "url": u}, ensure_ascii=False)
+                    yield json_bytes({"source": source, "url": u})
         return self._put_lines(key, gen())
 
-    def write_raw(self, jobs: List["RawJob"], role: str, city: str) -> str:
+    def write_raw(self, jobs: Iterable["RawJob"], role: str, city: str) -> str:
         key = "raw/raw_all_all.jsonl"
         def gen():
             for j in jobs:
-                yield j.to_json()
+                yield j.to_json_bytes()
         return self._put_lines(key, gen())
 
     def write_extracted(self, jobs: List["ExtractedJob"], role: str, city: str) -> str:
         key = "extracted/extracted_all_all.jsonl"
         def gen():
             for j in jobs:
-                yield j.to_json()
+                yield j.to_json_bytes()
         return self._put_lines(key, gen())
+
+    def write_extracted_parquet(self, jobs: List["ExtractedJob"], role: str, city: str) -> str:
+        """Write extracted jobs as one columnar Parquet file (zstd)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("pyarrow is required for Parquet output. Install with: pip install pyarrow")
+        key = "extracted/extracted_all_all.parquet"
+        list_cols = ("skills", "responsibilities", "qualifications")
+        int_cols = ("salary_min", "salary_max")
+        names = [f.name for f in fields(ExtractedJob)]
+        cols: Dict[str, list] = {n: [] for n in names}
+        for j in jobs:
+            for n in names:
+                cols[n].append(getattr(j, n))
+        for k in list_cols:
+            cols[k] = [v or [] for v in cols[k]]
+        schema = pa.schema([
+            (n, pa.list_(pa.string()) if n in list_cols else pa.int64() if n in int_cols else pa.string())
+            for n in names
+        ])
+        table = pa.Table.from_pydict(cols, schema=schema)
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink, compression="zstd")
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=sink.getvalue().to_pybytes())
+        return f"s3://{self.bucket}/{key}"
     
     def write_formatted(self, formatted_jobs: List[Dict], role: str, city: str) -> str:
         """Write formatted jobs in new structure."""
         key = "jobs_merged_all_all.json"
-        json_str = json.dumps(formatted_jobs, ensure_ascii=False, indent=2)
-        self.s3.put_object(Bucket=self.bucket, Key=key, Body=json_str.encode("utf-8"))
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=json_bytes(formatted_jobs, indent=True))
         return f"s3://{self.bucket}/{key}"
 
 # ========== Data models ============
@@ -79,7 +155,11 @@ class RawJob:
     text: str
 
     def to_json(self) -> str:
-        return json.dumps(asdict(self), ensure_ascii=False)
+        return self.to_json_bytes().decode("utf-8")
+
+    def to_json_bytes(self) -> bytes:
+        # Flat fields only, so the instance dict serializes as-is without asdict's deep copy
+        return json_bytes(self.__dict__)
 
 @dataclass
 class ExtractedJob:
@@ -89,9 +169,9 @@ class ExtractedJob:
     location: Optional[str]
     work_mode: Optional[str] = None
     employment_type: Optional[str] = None
-    skills: Optional[List[str]] = None
-    responsibilities: Optional[List[str]] = None
-    qualifications: Optional[List[str]] = None
+    skills: List[str] = field(default_factory=list)
+    responsibilities: List[str] = field(default_factory=list)
+    qualifications: List[str] = field(default_factory=list)
     experience_level: Optional[str] = None
     sector: Optional[str] = None
     country: Optional[str] = None
@@ -102,11 +182,10 @@ class ExtractedJob:
     salary_currency: Optional[str] = None
 
     def to_json(self) -> str:
-        obj = asdict(self)
-        for k in ("skills", "responsibilities", "qualifications"):
-            if obj.get(k) is None:
-                obj[k] = []
-        return json.dumps(obj, ensure_ascii=False)
+        return self.to_json_bytes().decode("utf-8")
+
+    def to_json_bytes(self) -> bytes:
+        return json_bytes(self.__dict__)
 
 # ========== Scraping logic & helpers =============
 DEFAULT_UA = (
@@ -114,87 +193,270 @@ DEFAULT_UA = (
     "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
 )
 
+# libxml2-backed parser; several times faster than the stdlib "html.parser"
+HTML_PARSER = "lxml"
+
 SESSION = requests.Session()
 SESSION.headers.update({"User-Agent": DEFAULT_UA})
 
+def configure_http_cache(path: str, expire_after: int = 3600) -> None:
+    """Swap SESSION for a SQLite-backed cache; honors Cache-Control and revalidates with ETags."""
+    global SESSION
+    try:
+        import requests_cache
+    except ImportError:
+        raise SystemExit("requests-cache is required for --http-cache. Install with: pip install requests-cache")
+    SESSION = requests_cache.CachedSession(path, backend="sqlite", expire_after=expire_after,
+                                           cache_control=True, stale_if_error=True)
+    SESSION.headers.update({"User-Agent": DEFAULT_UA})
+
+def configure_session(max_workers: int) -> None:
+    """Size the keep-alive pool so concurrent workers reuse connections instead of re-handshaking."""
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(max_workers, 10))
+    SESSION.mount("https://", adapter)
+    SESSION.mount("http://", adapter)
+
+class TokenBucket:
+    """Thread-safe token bucket: bursts up to `capacity`, refills continuously at `rate` tokens/sec."""
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+HOST_RATE = 5.0  # requests/sec per hostname; <= 0 disables throttling
+_HOST_BUCKETS: Dict[str, TokenBucket] = {}
+_HOST_BUCKETS_LOCK = threading.Lock()
+
+def configure_rate_limit(rate: float) -> None:
+    global HOST_RATE
+    HOST_RATE = rate
+    with _HOST_BUCKETS_LOCK:
+        _HOST_BUCKETS.clear()
+
+def throttle(url: str) -> None:
+    """Block until the per-host bucket for `url` grants a token; other hosts are unaffected."""
+    if HOST_RATE <= 0:
+        return
+    host = urlsplit(url).hostname or ""
+    bucket = _HOST_BUCKETS.get(host)
+    if bucket is None:
+        with _HOST_BUCKETS_LOCK:
+            bucket = _HOST_BUCKETS.setdefault(host, TokenBucket(HOST_RATE))
+    bucket.acquire()
+
+MAX_RETRY_AFTER = 60.0
+
+def retry_delay(r: requests.Response, default: float) -> float:
+    """Seconds to wait before retrying: the server's Retry-After if given in seconds, else `default`."""
+    ra = r.headers.get("Retry-After", "")
+    if ra.strip().isdigit():
+        return min(float(ra), MAX_RETRY_AFTER)
+    return default
+
 def fetch(url: str, retries: int = 3, backoff: float = 1.5) -> Optional[str]:
     for i in range(retries):
         try:
+            cache = getattr(SESSION, "cache", None)
+            if cache is None or not cache.contains(url=url):
+                throttle(url)
             r = SESSION.get(url, timeout=30)
-            if r.status_code == 200 and r.text:
-                return r.text
-            if r.status_code in (403, 429):
-                time.sleep(backoff * (i + 1))
+            if r.status_code == 200 and r.content:
+                # Greenhouse serves UTF-8; skip charset detection over the whole body
+                return r.content.decode("utf-8", errors="replace")
+            if r.status_code in (403, 429, 503):
+                time.sleep(retry_delay(r, backoff * 2 ** i))
+            elif 400 <= r.status_code < 500:
+                return None  # 404 and friends will not change on retry
         except Exception as e:
             logging.debug(f"Fetch error on {url}: {e}")
-            time.sleep(backoff * (i + 1))
+            time.sleep(backoff * 2 ** i)
     return None
 
 def soup_text(soup: BeautifulSoup) -> str:
     for tag in soup(["script", "style", "noscript"]):
         tag.decompose()
-    txt = soup.get_text("\n")
-    lines = [re.sub(r"\s+", " ", ln).strip() for ln in txt.splitlines()]
-    return "\n".join([ln for ln in lines if ln])
+    # Normalize text nodes as they stream out of the tree instead of joining the page into one
+    # string and splitting it back apart; str.split() collapses whitespace in one C pass
+    lines = (" ".join(ln.split()) for s in soup.strings for ln in s.splitlines())
+    return "\n".join(ln for ln in lines if ln)
 
 def _norm(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip()
+    return " ".join((s or "").split())
 
 LEVEL_PATTERNS = [
-    ("intern", r"\b(intern|co-?op|apprentice(ship)?)\b"),
-    ("entry", r"\b(junior|jr\.?|new grad|newgrad|graduate)\b"),
-    ("manager", r"\b(manager|managing|lead|head of|director|vp|vice president)\b"),
-    ("staff", r"\b(staff|principal|distinguished|fellow)\b"),
-    ("senior", r"\b(senior|sr\.?)\b"),
+    ("intern", r"\b(?:intern|co-?op|apprentice(?:ship)?)\b"),
+    ("entry", r"\b(?:junior|jr\.?|new grad|newgrad|graduate)\b"),
+    ("manager", r"\b(?:manager|managing|lead|head of|director|vp|vice president)\b"),
+    ("staff", r"\b(?:staff|principal|distinguished|fellow)\b"),
+    ("senior", r"\b(?:senior|sr\.?)\b"),
 ]
-LEVEL_RX = [(lbl, re.compile(rx, re.I)) for lbl, rx in LEVEL_PATTERNS]
+# One alternation of named groups reports every matching label in a single scan;
+# LEVEL_PATTERNS order still decides which label wins.
+LEVEL_ANY_RE = re.compile("|".join(f"(?P<{lbl}>{rx})" for lbl, rx in LEVEL_PATTERNS), re.I)
 
+@functools.lru_cache(maxsize=4096)
 def infer_level(title: str | None) -> str:
-    t = (title or "").lower()
+    t = title or ""  # LEVEL_ANY_RE is case-insensitive
     if not t:
         return "unknown"
-    for lbl, rx in LEVEL_RX:
-        if rx.search(t):
+    hits = {m.lastgroup for m in LEVEL_ANY_RE.finditer(t)}
+    for lbl, _ in LEVEL_PATTERNS:
+        if lbl in hits:
             return lbl
     return "mid"
 
-US_STATES = {"AL","AK","AZ","AR","CA","CO","CT","DE","FL","GA","HI","ID","IL","IN","IA",
+US_STATES = frozenset({"AL","AK","AZ","AR","CA","CO","CT","DE","FL","GA","HI","ID","IL","IN","IA",
     "KS","KY","LA","ME","MD","MA","MI","MN","MS","MO","MT","NE","NV","NH","NJ","NM",
     "NY","NC","ND","OH","OK","OR","PA","RI","SC","SD","TN","TX","UT","VT","VA","WA",
-    "WV","WI","WY"}
-CITY_STATE_RE = re.compile(r"([A-Za-z .'&/-]+),\s*(%s)\b" % "|".join(US_STATES))
+    "WV","WI","WY"})
+# Most common posting states first, then the rest in a fixed order (set iteration order is not)
+_STATES_ORDERED = ("CA", "NY", "TX", "WA", "MA", "IL", "FL", "CO", "GA", "NJ", "VA", "PA", "NC")
+_STATES_ORDERED += tuple(sorted(US_STATES.difference(_STATES_ORDERED)))
+# The city group cannot span a comma anyway; the cap keeps a long prose line from being captured whole
+CITY_STATE_RE = re.compile(r"([A-Za-z .'&/-]{1,60}?),\s*(%s)\b" % "|".join(_STATES_ORDERED))
 US_KEYWORDS_RE = re.compile(r"\b(united states|u\.s\.a|usa|u\.s\.|remote\s*[-–]?\s*us|remote\s+usa)\b", re.I)
+REMOTE_US_RE = re.compile(r"(remote\s*[-–]?\s*us[a]?)", re.I)
+
+def _country_from(s: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    s_low = s.lower()
+    if US_KEYWORDS_RE.search(s_low):
+        mrem = REMOTE_US_RE.search(s_low)
+        return ("United States", "Remote - US" if mrem else None)
+    m = CITY_STATE_RE.search(s)
+    if m:
+        return ("United States", f"{m.group(1).strip()}, {m.group(2)}")
+    if ";" in s:
+        parts = [p.strip() for p in s.split(";") if p.strip()]
+        for p in parts:
+            m2 = CITY_STATE_RE.search(p)
+            if m2:
+                return ("United States", f"{m2.group(1).strip()}, {m2.group(2)}")
+    if "united states" in s_low:
+        return ("United States", None)
+    return None
+
+# Location strings repeat across a company's postings; page heads rarely do, so only they are cached
+_country_from_location = functools.lru_cache(maxsize=4096)(_country_from)
 
 def infer_country_and_citystate(location: Optional[str], text: str) -> Tuple[Optional[str], Optional[str]]:
-    srcs = []
     if location:
-        srcs.append(location)
+        hit = _country_from_location(location)
+        if hit:
+            return hit
     if text:
-        head = "\n".join(text.split("\n")[:30])
-        srcs.append(head)
-    for s in srcs:
-        s_low = s.lower()
-        if US_KEYWORDS_RE.search(s_low):
-            mrem = re.search(r"(remote\s*[-–]?\s*us[a]?)", s_low, re.I)
-            return ("United States", "Remote - US" if mrem else None)
-        m = CITY_STATE_RE.search(s)
-        if m:
-            return ("United States", f"{m.group(1).strip()}, {m.group(2)}")
-        if ";" in s:
-            parts = [p.strip() for p in s.split(";") if p.strip()]
-            for p in parts:
-                m2 = CITY_STATE_RE.search(p)
-                if m2:
-                    return ("United States", f"{m2.group(1).strip()}, {m2.group(2)}")
-        if "united states" in s_low:
-            return ("United States", None)
+        hit = _country_from("\n".join(text.split("\n", 30)[:30]))
+        if hit:
+            return hit
     return (None, None)
 
+TRACKING_PARAMS = {"gh_src", "gclid", "fbclid", "mc_cid", "mc_eid", "ref", "source"}
+
+def normalize_url(url: str) -> str:
+    """Canonical form for dedup: lowercase host, no fragment/tracking params, sorted query."""
+    parts = urlsplit(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS)
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+class SeenUrls:
+    """
+    Normalized URLs accepted by earlier runs, persisted one per line so
+    repeat crawls can skip postings they already collected.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._urls: set = set()
+        self._new: List[str] = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._urls = {ln.strip() for ln in f if ln.strip()}
+
+    def __contains__(self, url: str) -> bool:
+        return normalize_url(url) in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def add(self, url: str) -> None:
+        n = normalize_url(url)
+        if n not in self._urls:
+            self._urls.add(n)
+            self._new.append(n)
+
+    def save(self) -> None:
+        if not self._new:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(u + "\n" for u in self._new)
+        self._new = []
+
+DIGITS_RE = re.compile(r"\d+", re.ASCII)
+
+def simhash64(tokens: List[str]) -> int:
+    """64-bit SimHash over word 3-shingles; similar texts differ in few bits."""
+    weights = [0] * 64
+    for i in range(max(len(tokens) - 2, 1)):
+        shingle = " ".join(tokens[i:i + 3]).encode("utf-8")
+        h = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+class DuplicateFilter:
+    """
+    Flags postings that repeat one already kept at the same location: exact
+    copies of title+text by BLAKE2b digest, near-copies (cross-posts,
+    reformatted boards) of the same title by SimHash Hamming distance
+    <= max_distance. The same role opened in different cities is kept once
+    per city, and numbered openings ("Engineer 2", "Engineer 3") are kept apart.
+    """
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self._digests: set = set()
+        self._hashes: Dict[str, List[int]] = {}
+
+    def is_duplicate(self, title: Optional[str], text: str, location: Optional[str] = None) -> bool:
+        loc = " ".join((location or "").lower().split())
+        head = " ".join((title or "").lower().split())
+        norm = " ".join(text.lower().split())
+        # Exact copies keep their digits: a different pay range is a different posting
+        digest = hashlib.blake2b(f"{loc}\n{head}\n{norm}".encode("utf-8"), digest_size=16).digest()
+        if digest in self._digests:
+            return True
+        self._digests.add(digest)
+        if self.max_distance < 0:
+            return False
+        # Near-copy features drop digits, which vary between cross-posts (dates, req ids)
+        h = simhash64(DIGITS_RE.sub("", f"{head}\n{norm}").split())
+        hashes = self._hashes.setdefault(f"{loc}\n{head}", [])
+        if any(bin(h ^ other).count("1") <= self.max_distance for other in hashes):
+            return True
+        hashes.append(h)
+        return False
+
 # Job ID extractor from URL
+JOB_ID_RE = re.compile(r"/job/(\d+)|gh_jid=(\d+)", re.ASCII)
+
 def extract_job_id(url: str) -> Optional[str]:
     """Extract job ID from Greenhouse URL patterns."""
     # Try to find pattern like /job/123456 or ?gh_jid=123456
-    match = re.search(r"/job/(\d+)|gh_jid=(\d+)", url)
+    match = JOB_ID_RE.search(url)
     if match:
         return match.group(1) or match.group(2)
     return None
@@ -299,6 +561,17 @@ def format_job_record(job: ExtractedJob, job_id: Optional[str] = None) -> Dict:
         "meta": meta
     }
 
+SALARY_RE = re.compile(r"\$([0-9,]+)", re.ASCII)
+WORK_MODE_KEYWORDS = ("remote", "hybrid", "onsite", "on-site")
+WORK_MODE_RE = re.compile(r"\b(remote|hybrid|onsite|on-site)\b", re.I)
+EMPLOYMENT_TYPE_PATTERNS = [
+    ("Full Time", r"\b(full.?time|fulltime|ft)\b"),
+    ("Part Time", r"\b(part.?time|parttime|pt)\b"),
+    ("Contract", r"\b(contract|contractor)\b"),
+    ("Internship", r"\b(intern|internship)\b"),
+]
+EMPLOYMENT_TYPE_RX = [(lbl, re.compile(rx, re.I)) for lbl, rx in EMPLOYMENT_TYPE_PATTERNS]
+
 # Heuristic extractor
 def heuristic_extract(raw: RawJob) -> ExtractedJob:
     desc = raw.text if hasattr(raw, "text") else ""
@@ -308,7 +581,7 @@ def heuristic_extract(raw: RawJob) -> ExtractedJob:
     
     # Extract salary information
     salary_min, salary_max, salary_unit, salary_currency = None, None, None, None
-    sal_match = re.search(r"\$([0-9,]+)", desc)
+    sal_match = SALARY_RE.search(desc) if "$" in desc else None
     if sal_match:
         salary_min = int(sal_match.group(1).replace(",", ""))
         salary_unit = "annual"
@@ -319,24 +592,22 @@ def heuristic_extract(raw: RawJob) -> ExtractedJob:
     country, city_state = infer_country_and_citystate(location, desc)
     
     # Extract work mode and employment type from text
+    # Cheap substring screen first; most postings lack some of these keywords
+    desc_low = desc.lower()
     work_mode = None
-    if re.search(r"\b(remote|hybrid|onsite|on-site)\b", desc, re.I):
-        if re.search(r"remote", desc, re.I):
+    if any(k in desc_low for k in WORK_MODE_KEYWORDS) and WORK_MODE_RE.search(desc):
+        if "remote" in desc_low:
             work_mode = "Remote"
-        elif re.search(r"hybrid", desc, re.I):
+        elif "hybrid" in desc_low:
             work_mode = "Hybrid"
         else:
             work_mode = "On-site"
     
     employment_type = None
-    if re.search(r"\b(full.?time|fulltime|ft)\b", desc, re.I):
-        employment_type = "Full Time"
-    elif re.search(r"\b(part.?time|parttime|pt)\b", desc, re.I):
-        employment_type = "Part Time"
-    elif re.search(r"\b(contract|contractor)\b", desc, re.I):
-        employment_type = "Contract"
-    elif re.search(r"\b(intern|internship)\b", desc, re.I):
-        employment_type = "Internship"
+    for lbl, rx in EMPLOYMENT_TYPE_RX:
+        if rx.search(desc):
+            employment_type = lbl
+            break
     
     return ExtractedJob(
         url=raw.url,
@@ -358,43 +629,90 @@ def heuristic_extract(raw: RawJob) -> ExtractedJob:
         qualifications=[]
     )
 
+def extract_and_format(raw: RawJob) -> Tuple[ExtractedJob, Dict]:
+    """heuristic_extract + format_job_record; module-level so worker processes can run it."""
+    ej = heuristic_extract(raw)
+    return ej, format_job_record(ej)
+
+# "/jobs/" is covered by "/job"; plain substring tests beat regex dispatch on short hrefs
+JOB_LINK_TOKENS = ("/job", "gh_jid=", "embed/job_app")
+WORD_RE = re.compile(r"\w+")
+
 # Main Greenhouse scraper
 class GreenhouseScraper:
     BASES = [
         "https://boards.greenhouse.io/",
         "https://job-boards.greenhouse.io/",
     ]
+
+    def __init__(self, max_workers: int = 8, seen: Optional[SeenUrls] = None):
+        self.max_workers = max_workers
+        self.seen = seen
+
+    def _map(self, fn, items: Iterable) -> Iterable:
+        """Apply fn to items on a thread pool; results are yielded in input order."""
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            yield from map(fn, items)
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as ex:
+            yield from ex.map(fn, items)
+
     def resolve_board(self, company: str) -> Tuple[Optional[str], Optional[str]]:
-        comp = company.lower().strip()
-        for base in self.BASES:
-            url = urljoin(base, comp)
-            html = fetch(url)
-            if html:
-                return url, html
+        """`company` is a board slug, already lowercased and stripped by the caller."""
+        urls = [base + company for base in self.BASES]
+        if self.max_workers <= 1:
+            for url in urls:
+                html = fetch(url)
+                if html:
+                    return url, html
+            return None, None
+        # Probe every base at once and take the first board that answers, so a miss on
+        # one host no longer has to run out its retries before the next is tried
+        ex = ThreadPoolExecutor(max_workers=len(urls))
+        try:
+            pending = {ex.submit(fetch, url): url for url in urls}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    url = pending.pop(f)
+                    html = f.result()
+                    if html:
+                        return url, html
+        finally:
+            ex.shutdown(wait=False, cancel_futures=True)
         return None, None
 
     def extract_links_from_board(self, html: str, board_url: str) -> List[str]:
-        soup = BeautifulSoup(html, "html.parser")
+        # Only <a href> nodes are needed; skip building the rest of the board DOM
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("a", href=True))
+        parts = urlsplit(board_url)
+        origin = f"{parts.scheme}://{parts.netloc}"
         links: List[str] = []
         for a in soup.find_all("a", href=True):
             href = a["href"].strip()
             if not href:
                 continue
-            if re.search(r"(/job|/jobs/|gh_jid=|embed/job_app)", href):
-                links.append(urljoin(board_url, href))
-        out, seen = [], set()
-        for u in links:
-            if "greenhouse.io" not in u:
-                continue
-            if u not in seen:
-                seen.add(u)
+            if any(tok in href for tok in JOB_LINK_TOKENS):
+                # Board links are absolute or site-relative; only fall back to urljoin for the rest
+                if href.startswith(("https://", "http://")):
+                    links.append(href)
+                elif href.startswith("/") and not href.startswith("//"):
+                    links.append(origin + href)
+                else:
+                    links.append(urljoin(board_url, href))
+        out = []
+        for u in dict.fromkeys(links):
+            # Match the host, not the whole URL: '?u=https://greenhouse.io/...' is not a posting
+            host = urlsplit(u).hostname or ""
+            if host == "greenhouse.io" or host.endswith(".greenhouse.io"):
                 out.append(u)
         return out
 
-    def _title_matches(self, soup: BeautifulSoup, role: str) -> bool:
+    def _title_matches(self, soup: BeautifulSoup, role_tokens: List[str]) -> bool:
         title_el = soup.find(["h1", "h2"]) or soup.find("title")
         title_txt = (title_el.get_text(" ", strip=True).lower() if title_el else "")
-        return all(tok in title_txt for tok in role.lower().split())
+        return all(tok in title_txt for tok in role_tokens)
 
     def _location_text(self, soup: BeautifulSoup) -> str:
         for cand in soup.select(".location, .posting-categories, [data-company-location], .app-title"):
@@ -404,15 +722,39 @@ class GreenhouseScraper:
         return ""
 
     def filter_links(self, links: Iterable[str], role: str, city: Optional[str], strict: bool) -> List[str]:
+        return [url for url, _, _ in self.filter_pages(links, role, city, strict)]
+
+    def filter_pages(self, links: Iterable[str], role: str, city: Optional[str],
+                     strict: bool) -> Iterator[Tuple[str, str, BeautifulSoup]]:
+        """
+        Like filter_links, but yield each accepted page's (url, html, soup) for
+        parse_job_from_soup. Lazy, so a consumer that handles one page at a time
+        keeps only that page's soup alive (an lxml tree is ~50x its HTML).
+        """
         role_all = not role or role.strip().lower() == "all"
-        out: List[str] = []
+        role_tokens = [] if role_all else role.lower().split()
         city_q = (city or "").lower()
-        for url in links:
-            html = fetch(url)
+        city_key = city_q if strict else city_q.split(",")[0]
+        # Words the page must contain somewhere for the title/location checks to pass.
+        # The city is split into bare words: markup may sit between the words of a
+        # multi-word city ("<span>New</span> <span>York</span>, NY"). Pages that miss a
+        # key are re-checked after entity decoding, since the raw HTML may hold
+        # non-ASCII text as e.g. "d&eacute;veloppeur".
+        required = [k for k in role_tokens + WORD_RE.findall(city_key) if "&" not in k]
+        links = list(links)
+        for url, html in zip(links, self._map(fetch, links)):
             if not html:
                 continue
-            soup = BeautifulSoup(html, "html.parser")
-            if not role_all and not self._title_matches(soup, role):
+            if required:
+                html_low = html.lower()
+                if not all(k in html_low for k in required):
+                    if "&" not in html_low:
+                        continue
+                    html_low = unescape(html).lower()
+                    if not all(k in html_low for k in required):
+                        continue
+            soup = BeautifulSoup(html, HTML_PARSER)
+            if not role_all and not self._title_matches(soup, role_tokens):
                 continue
             if city:
                 loc = self._location_text(soup).lower()
@@ -422,41 +764,57 @@ class GreenhouseScraper:
                 else:
                     if city_q and city_q.split(",")[0] not in loc:
                         continue
-            out.append(url)
-            time.sleep(0.2)
-        return out
+            yield url, html, soup
 
     def get_all_job_urls(self, role: str, city: Optional[str], strict: bool,
                          companies: List[str], limit: int) -> List[str]:
-        urls: List[str] = []
-        for comp in companies:
-            board_url, html = self.resolve_board(comp)
+        return [url for url, _, _ in self.get_all_job_pages(role, city, strict, companies, limit)]
+
+    def get_all_job_pages(self, role: str, city: Optional[str], strict: bool,
+                          companies: List[str], limit: int) -> Iterator[Tuple[str, str, BeautifulSoup]]:
+        """
+        Matching postings as (url, html, soup), so they need not be fetched again.
+        Yielded as boards are scanned, each URL once, stopping after `limit` (<=0 = no limit).
+        """
+        yielded: set = set()
+        for comp, (board_url, html) in zip(companies, self._map(self.resolve_board, companies)):
             if not html:
                 logging.info(f"No board found for {comp}")
                 continue
             raw_links = self.extract_links_from_board(html, board_url)
-            flinks = self.filter_links(raw_links, role, city, strict)
-            urls.extend(flinks)
-            logging.info(f"{comp}: {len(flinks)} matches")
-            if limit > 0 and len(urls) >= limit:
-                break
-            time.sleep(0.6)
-        seen, dedup = set(), []
-        for u in urls:
-            if u not in seen:
-                seen.add(u)
-                dedup.append(u)
-        return dedup if limit <= 0 else dedup[:limit]
+            if self.seen is not None:
+                raw_links = [u for u in raw_links if u not in self.seen]
+            matches = 0
+            for page in self.filter_pages(raw_links, role, city, strict):
+                url = page[0]
+                if self.seen is not None:
+                    self.seen.add(url)
+                if url in yielded:
+                    continue
+                yielded.add(url)
+                matches += 1
+                yield page
+                if 0 < limit <= len(yielded):
+                    logging.info(f"{comp}: {matches} matches")
+                    return
+            logging.info(f"{comp}: {matches} matches")
+
+    def parse_jobs(self, urls: Iterable[str]) -> Iterable[Optional[RawJob]]:
+        """Fetch and parse postings concurrently, yielding results in input order."""
+        return self._map(self.parse_job, urls)
 
     def parse_job(self, url: str) -> Optional[RawJob]:
         html = fetch(url)
         if not html:
             return None
-        soup = BeautifulSoup(html, "html.parser")
+        return self.parse_job_from_soup(url, html, BeautifulSoup(html, HTML_PARSER))
+
+    def parse_job_from_soup(self, url: str, html: str, soup: BeautifulSoup) -> RawJob:
         title_el = soup.find("h1") or soup.find("h2")
         title = title_el.get_text(strip=True) if title_el else None
         company = None
-        og = soup.find("meta", attrs={"property": "og:site_name"})
+        # <meta> tags live in <head>; search that small subtree rather than the whole page
+        og = (soup.head or soup).find("meta", attrs={"property": "og:site_name"})
         if og and og.get("content"):
             company = og["content"].strip() or None
         if not company:
@@ -482,12 +840,34 @@ def main():
     ap.add_argument("--city", default="all", help="City text to match, or 'all' (skipped by default)")
     ap.add_argument("--strict-location", action="store_true", help="Exact city substring match (if --city provided)")
     ap.add_argument("--limit", type=int, default=-1, help="Max URLs to fetch overall (<=0 = unlimited)")
+    ap.add_argument("--workers", type=int, default=8, help="Concurrent HTTP requests (1 = sequential)")
+    ap.add_argument("--rate-per-host", type=float, default=HOST_RATE, help="Max requests/sec to any one host (0 = unlimited)")
+    ap.add_argument("--http-cache", default=None,
+                    help="SQLite file for an on-disk HTTP cache (requires requests-cache); reruns revalidate instead of re-downloading")
+    ap.add_argument("--seen-urls", default=None,
+                    help="File of URLs collected by earlier runs; those are skipped and new matches appended")
+    ap.add_argument("--near-dup-distance", type=int, default=3,
+                    help="Max SimHash bit distance treated as a duplicate posting at the same location (<0 = exact duplicates only)")
+    ap.add_argument("--extract-workers", type=int, default=1,
+                    help="Processes for heuristic extraction (1 = in-process; >1 uses a process pool)")
     ap.add_argument("--log", default="INFO")
     ap.add_argument("--s3-bucket", default="nexai-job-market-data", help="Target S3 bucket name")
     ap.add_argument("--aws-region", default="us-east-1", help="AWS region for S3 client")
+    ap.add_argument("--no-compress", action="store_true", help="Upload JSONL files uncompressed (no .gz suffix)")
+    ap.add_argument("--extracted-format", choices=("jsonl", "parquet"), default="jsonl",
+                    help="Output format for extracted jobs (parquet requires pyarrow)")
     args = ap.parse_args()
-    logging.basicConfig(level=getattr(logging, args.log.upper(), logging.INFO), format="%(levelname)s: %(message)s")
-    store = S3Storage(bucket=args.s3_bucket, region=args.aws_region)
+    # Worker threads only enqueue records; a single listener thread formats and writes them
+    log_queue: SimpleQueue = SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+    listener = QueueListener(log_queue, console)
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, args.log.upper(), logging.INFO))
+    root.addHandler(QueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    store = S3Storage(bucket=args.s3_bucket, region=args.aws_region, compress=not args.no_compress)
     print(f"🪣 Using S3 storage → s3://{args.s3_bucket}/(links|raw|extracted)/...")
 
     companies = [
@@ -499,66 +879,88 @@ def main():
         "dlrgroup","dataiku","point72","lilasciences","integrainterns","aef","strongholdim","samsungsemiconductor","xpengmotors",
         "scaleai","sonyinteractiveentertainmentglobal","gofundme","spacex","lokajobs","mirakl" # Add your companies here, e.g., "figma", "gitlab", etc.
     ]
+    # Normalize once (and drop repeats) rather than per board lookup
+    companies = list(dict.fromkeys(sys.intern(c.strip().lower()) for c in companies))
     role = args.role.strip() if args.role else "all"
     city = None if (args.city or "all").lower() == "all" else args.city.strip()
-    gh = GreenhouseScraper()
+    seen = SeenUrls(args.seen_urls) if args.seen_urls else None
+    if seen is not None:
+        print(f"🔁 Skipping {len(seen)} URLs seen in earlier runs ({args.seen_urls})")
+    if args.http_cache:
+        configure_http_cache(args.http_cache)
+    configure_session(args.workers)
+    configure_rate_limit(args.rate_per_host)
+    gh = GreenhouseScraper(max_workers=args.workers, seen=seen)
     print("\n" + "=" * 78)
     print("GREENHOUSE SCRAPER — ROLE AGNOSTIC")
     print("=" * 78)
-    print(f"\n[1/4] Scanning {len(companies)} Greenhouse boards…")
-    urls: List[str] = []
-    for comp in companies:
-        board_url, html = gh.resolve_board(comp)
-        if not html:
-            logging.info(f"No board found for {comp}")
-            continue
-        raw_links = gh.extract_links_from_board(html, board_url)
-        flinks = gh.filter_links(raw_links, role, city, args.strict_location)
-        urls.extend(flinks)
-        logging.info(f"{comp}: {len(flinks)} matches")
-        if args.limit > 0 and len(urls) >= args.limit:
-            break
-        time.sleep(0.4)
-    seen, dedup = set(), []
-    for u in urls:
-        if u not in seen:
-            seen.add(u)
-            dedup.append(u)
-    if args.limit > 0:
-        dedup = dedup[:args.limit]
-    links = {"greenhouse": dedup}
-    print(f" → {len(dedup)} URLs matched")
-    links_path = store.write_links(links, role or "all", city or "all")
-    print(f" saved: {links_path}")
-
-    if not dedup:
+    print(f"\n[1-3/4] Scanning {len(companies)} Greenhouse boards; parsing and extracting matches as they arrive…")
+    # Matched pages are produced one at a time while boards are scanned, and each is
+    # parsed, extracted and encoded into the raw upload before the next is fetched,
+    # so only one posting's HTML and soup is held at once
+    pages = gh.get_all_job_pages(role, city, args.strict_location, companies, args.limit)
+    first = next(pages, None)
+    if first is None:
+        links_path = store.write_links({"greenhouse": []}, role or "all", city or "all")
+        print(" → 0 URLs matched")
+        print(f" saved: {links_path}")
         print("No matches. Exiting.")
         return
-
-    print(f"\n[2/4] Downloading {len(dedup)} postings…")
-    raw: List[RawJob] = []
-    for i, u in enumerate(dedup, 1):
-        rj = gh.parse_job(u)
-        if rj:
-            raw.append(rj)
-            print(f" [{i}/{len(dedup)}] ✓ {rj.company or 'Unknown'} | {rj.title or 'Untitled'}")
-        time.sleep(0.25)
-    raw_path = store.write_raw(raw, role or "all", city or "all")
+    pages = chain((first,), pages)
+    del first
+
+    matched: List[str] = []
+    dupes = DuplicateFilter(max_distance=args.near_dup_distance)
+    extract_pool = ProcessPoolExecutor(max_workers=args.extract_workers) if args.extract_workers > 1 else None
+    results: list = []
+    skipped = 0
+    log_items = logging.getLogger().isEnabledFor(logging.INFO)
+
+    def raw_stream() -> Iterable[RawJob]:
+        nonlocal skipped
+        for i, (u, html, soup) in enumerate(pages, 1):
+            matched.append(u)
+            rj = gh.parse_job_from_soup(u, html, soup)
+            if dupes.is_duplicate(rj.title, rj.text, rj.location):
+                skipped += 1
+                continue
+            if log_items:
+                logging.info("[%d] %s | %s", i, rj.company or "Unknown", rj.title or "Untitled")
+            if extract_pool is not None:
+                # Extraction only reads the text fields; don't ship HTML to workers
+                results.append(extract_pool.submit(extract_and_format, replace(rj, html="")))
+            else:
+                results.append(extract_and_format(rj))
+            yield rj
+
+    raw_path = store.write_raw(raw_stream(), role or "all", city or "all")
+    print(f" → {len(matched)} URLs matched")
+    if skipped:
+        print(f" skipped {skipped} duplicate postings")
     print(f" saved: {raw_path}")
-
-    print(f"\n[3/4] Extracting lightweight structure…")
-    extracted = [heuristic_extract(r) for r in raw]
-    
-    print(f"\n[3.5/4] Formatting in new structure…")
-    formatted = [format_job_record(job) for job in extracted]
+    links_path = store.write_links({"greenhouse": matched}, role or "all", city or "all")
+    print(f" saved: {links_path}")
+    if extract_pool is not None:
+        with extract_pool:
+            results = [f.result() for f in results]
+    extracted: List[ExtractedJob] = [ej for ej, _ in results]
+    formatted: List[Dict] = [rec for _, rec in results]
 
     print(f"\n[4/4] Writing JSON…")
-    out_path = store.write_extracted(extracted, role or "all", city or "all")
-    print(f" saved: {out_path}")
-    
+    write_extracted = store.write_extracted_parquet if args.extracted_format == "parquet" else store.write_extracted
+    uploads = ThreadPoolExecutor(max_workers=2)
+    out_future = uploads.submit(write_extracted, extracted, role or "all", city or "all")
     # Also save in new format
-    formatted_path = store.write_formatted(formatted, role or "all", city or "all")
-    print(f" saved (new format): {formatted_path}")
+    formatted_future = uploads.submit(store.write_formatted, formatted, role or "all", city or "all")
+    with uploads:
+        out_path = out_future.result()
+        print(f" saved: {out_path}")
+        formatted_path = formatted_future.result()
+        print(f" saved (new format): {formatted_path}")
+
+    # Only record URLs as seen once their output has been written
+    if seen is not None:
+        seen.save()
 
     print("\n" + "=" * 78)
     print("DONE")
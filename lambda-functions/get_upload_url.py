@@ -1,18 +1,28 @@
-import os, json, uuid, boto3
+import os, json, secrets, boto3
+from botocore.config import Config
 
-s3 = boto3.client("s3")
+# Created once per container and reused by warm invocations; short timeouts
+# keep a slow S3 call from eating the function's billed time
+s3 = boto3.client("s3", config=Config(
+    tcp_keepalive=True, connect_timeout=1, read_timeout=2,
+    retries={"max_attempts": 2, "mode": "standard"},
+))
 BUCKET = os.environ.get("UPLOAD_BUCKET", "resume-uploads-hackathon")
 
+# Built once per container rather than on every invocation
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Methods": "POST,OPTIONS"
+}
+JSON_HEADERS = {"Content-Type": "application/json", **CORS_HEADERS}
+
 def lambda_handler(event, context):
     # CORS preflight
     if event.get("httpMethod") == "OPTIONS":
         return {
             "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type",
-                "Access-Control-Allow-Methods": "POST,OPTIONS"
-            },
+            "headers": CORS_HEADERS,
             "body": "{}"
         }
 
@@ -20,7 +30,7 @@ def lambda_handler(event, context):
     filename = body.get("filename", "resume.pdf")
     content_type = body.get("contentType", "application/pdf")
 
-    key = f"resumes/session_{uuid.uuid4().hex}/{filename}"
+    key = f"resumes/session_{secrets.token_hex(16)}/{filename}"
     url = s3.generate_presigned_url(
         "put_object",
         Params={"Bucket": BUCKET, "Key": key, "ContentType": content_type},
@@ -29,11 +39,6 @@ def lambda_handler(event, context):
 
     return {
         "statusCode": 200,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type",
-            "Access-Control-Allow-Methods": "POST,OPTIONS"
-        },
+        "headers": JSON_HEADERS,
         "body": json.dumps({"url": url, "key": key})
     }
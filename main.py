@@ -3,11 +3,16 @@ Main entry point - with AWS Bedrock extraction
 """
 import asyncio
 from config import settings
-from src.utils.validators import get_user_input
+from src.utils.validators import get_user_input_async
 from src.scrapers.greenhouse_scraper import GreenhouseScraper
 from src.scrapers.wellfound_scraper import WellfoundScraper
 from src.storage.s3_manager import S3Manager
-from src.extractors.bedrock_extractor import BedrockBatchExtractor
+from src.extractors.bedrock_extractor import BedrockBatchExtractor, BedrockExtractor
+
+# Concurrent Bedrock extractions
+EXTRACT_WORKERS = 5
+# Postings packed into one Bedrock call when several are waiting
+JOBS_PER_CALL = BedrockExtractor.MAX_JOBS_PER_CALL
 
 
 async def main():
@@ -21,7 +26,7 @@ async def main():
         return
     
     # Get user input
-    job_title, location, strict_location = get_user_input()
+    job_title, location, strict_location = await get_user_input_async()
     
     print("\n" + "=" * 80)
     print("JOB MARKET AGENT - WITH AWS BEDROCK EXTRACTION")
@@ -51,38 +56,88 @@ async def main():
     
     print(f"\n  📋 Found {total_urls} job URLs")
     
-    # Upload URLs
-    uploaded_keys = s3_manager.upload_individual_links(all_links, job_title, location or "all")
+    # Upload URLs in the background; scraping does not need to wait for S3
+    upload_task = asyncio.create_task(asyncio.to_thread(
+        s3_manager.upload_individual_links, all_links, job_title, location or "all"
+    ))
     
     # ========================================================================
-    # STEP 2: SCRAPE RAW HTML
+    # STEPS 2 & 3: SCRAPE RAW HTML, EXTRACT WITH AWS BEDROCK (pipelined)
     # ========================================================================
     print(f"\n[STEP 2] Scraping {total_urls} job postings (raw HTML)...")
+    print(f"[STEP 3] Extracting structured data with AWS Bedrock as postings arrive...")
+    print(f"  Model: {settings.BEDROCK_MODEL_ID}")
+    print(f"  Up to {EXTRACT_WORKERS} extractions in flight...")
+    
+    # The URLs are already in memory; no need to read them back from S3.
+    # Each keeps the scraper for the source it came from.
+    scrapers = {"greenhouse": greenhouse_scraper, "wellfound": wellfound_scraper}
+    tasks = [(scrapers[source], url) for source, urls in all_links.items() for url in urls]
+    
+    # Scrapers feed the queue while Bedrock workers drain it, so extraction
+    # starts with the first posting instead of after the last one
+    queue = asyncio.Queue(maxsize=64)
+    extracted_jobs = []
     
-    all_urls = s3_manager.download_all_links(uploaded_keys)
-    raw_jobs = []
+    # Fetch postings concurrently, at most MAX_CONCURRENT_REQUESTS in flight
+    sem = asyncio.Semaphore(settings.MAX_CONCURRENT_REQUESTS)
     
-    for i, url in enumerate(all_urls, 1):
-        source = "greenhouse" if "greenhouse" in url else "wellfound"
-        scraper = greenhouse_scraper if source == "greenhouse" else wellfound_scraper
-        
-        raw_job = await scraper.parse_job(url)
+    async def scrape(i, scraper, url):
+        async with sem:
+            raw_job = await scraper.parse_job(url)
         if raw_job:
-            raw_jobs.append(raw_job)
             title = raw_job.get('title', 'Unknown')[:40]
             company = raw_job.get('company', 'Unknown')[:20]
             print(f"  [{i}/{total_urls}] ✓ {company} | {title}")
+            await queue.put(raw_job)
+        return raw_job
+    
+    async def extract_worker():
+        done = False
+        while not done:
+            # Wait for one posting, then take whatever else is already queued,
+            # so several postings share a Bedrock call when scraping runs ahead.
+            # Stop at this worker's sentinel so the others still get theirs.
+            items = [await queue.get()]
+            while items[-1] is not None and len(items) < JOBS_PER_CALL and not queue.empty():
+                items.append(queue.get_nowait())
+            done = items[-1] is None
+            group = [raw_job for raw_job in items if raw_job is not None]
+            try:
+                if group:
+                    extracted = await bedrock_extractor.extract_group(group)
+                    extracted_jobs.extend(job for job in extracted if job)
+            except Exception as e:
+                # One bad group must not kill the worker; if every worker died,
+                # nothing would drain the queue and the scrapers would block on put()
+                urls = ', '.join(raw_job.get('url', '') for raw_job in group)
+                print(f"  ✗ Extraction failed for {urls}: {type(e).__name__}: {e}")
+            finally:
+                for _ in items:
+                    queue.task_done()
+    
+    workers = [asyncio.create_task(extract_worker()) for _ in range(EXTRACT_WORKERS)]
+    results = await asyncio.gather(
+        *(scrape(i, scraper, url) for i, (scraper, url) in enumerate(tasks, 1)), return_exceptions=True
+    )
+    raw_jobs = [job for job in results if job and not isinstance(job, Exception)]
+    await greenhouse_scraper.aclose()
     
     print(f"\n  ✅ Scraped {len(raw_jobs)} jobs")
     
-    # ========================================================================
-    # STEP 3: EXTRACT STRUCTURED DATA WITH AWS BEDROCK
-    # ========================================================================
-    print(f"\n[STEP 3] Extracting structured data with AWS Bedrock...")
-    print(f"  Model: {settings.BEDROCK_MODEL_ID}")
-    print(f"  Processing {len(raw_jobs)} jobs in batches of 5...")
+    # One sentinel per worker once every posting has been queued
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    await bedrock_extractor.aclose()
     
-    extracted_jobs = await bedrock_extractor.extract_batch(raw_jobs, batch_size=5)
+    # The Bedrock results are already paid for; a failed URL upload must not discard them
+    try:
+        await upload_task
+        links_uploaded = True
+    except Exception as e:
+        print(f"\n  ⚠️  Job URL upload failed: {type(e).__name__}: {e}")
+        links_uploaded = False
     
     print(f"\n  ✅ Successfully extracted {len(extracted_jobs)}/{len(raw_jobs)} jobs")
     
@@ -115,7 +170,10 @@ async def main():
     print(f"  Success Rate: {len(extracted_jobs)/len(raw_jobs)*100:.1f}%")
     
     print(f"\n📁 S3 STORAGE:")
-    print(f"  Job URLs: s3://{settings.S3_BUCKET_NAME}/{settings.S3_LINKS_PREFIX}")
+    if links_uploaded:
+        print(f"  Job URLs: s3://{settings.S3_BUCKET_NAME}/{settings.S3_LINKS_PREFIX}")
+    else:
+        print(f"  Job URLs: upload failed (see warning above)")
     print(f"  Extracted JSON: s3://{settings.S3_BUCKET_NAME}/{extracted_s3_key}")
     print("=" * 80)
 
@@ -3,11 +3,11 @@ TEST VERSION - Only Steps 1 & 2 (no Bedrock extraction)
 """
 import asyncio
 from config import settings
-from src.utils.validators import get_user_input
+from src.utils.validators import get_user_input_async
 from src.scrapers.greenhouse_scraper import GreenhouseScraper
 from src.scrapers.wellfound_scraper import WellfoundScraper
 from src.storage.s3_manager import S3Manager
-import json
+from src.utils.helpers import json_dumps
 
 
 async def main():
@@ -21,7 +21,7 @@ async def main():
         return
     
     # Get user input
-    job_title, location, strict_location = get_user_input()
+    job_title, location, strict_location = await get_user_input_async()
     
     print("\n" + "=" * 80)
     print("JOB MARKET AGENT - TEST MODE (Steps 1 & 2 Only)")
@@ -68,20 +68,42 @@ async def main():
     print(f"\n[STEP 2] Scraping {total_urls} job postings (raw HTML)...")
     
     all_urls = s3_manager.download_all_links(uploaded_keys)
+    
+    # Scraper for each URL, by the source it was collected from
+    scrapers = {"greenhouse": greenhouse_scraper, "wellfound": wellfound_scraper}
+    url_scrapers = {url: scrapers[source] for source, urls in all_links.items() for url in urls}
+    
+    # Fetch postings concurrently, at most MAX_CONCURRENT_REQUESTS in flight
+    sem = asyncio.Semaphore(settings.MAX_CONCURRENT_REQUESTS)
+    
+    # Raw jobs are streamed to disk as JSON Lines while scraping; only a few
+    # are kept in memory for the preview below
+    all_jobs_file = settings.RAW_DATA_DIR / f'all_raw_jobs_{job_title.replace(" ", "_")}.jsonl'
+    all_jobs_file.parent.mkdir(parents=True, exist_ok=True)
     raw_jobs = []
+    scraped = 0
     
-    for i, url in enumerate(all_urls, 1):
-        source = "greenhouse" if "greenhouse" in url else "wellfound"
-        scraper = greenhouse_scraper if source == "greenhouse" else wellfound_scraper
-        
-        raw_job = await scraper.parse_job(url)
+    async def scrape(i, url):
+        nonlocal scraped
+        scraper = url_scrapers[url]
+        async with sem:
+            raw_job = await scraper.parse_job(url)
         if raw_job:
-            raw_jobs.append(raw_job)
+            out.write(json_dumps(raw_job) + b'\n')
+            scraped += 1
+            if len(raw_jobs) < 5:
+                raw_jobs.append(raw_job)
             title = raw_job.get('title', 'Unknown')[:40]
             company = raw_job.get('company', 'Unknown')[:20]
             print(f"  [{i}/{total_urls}] ✓ {company} | {title}")
     
-    print(f"\n  ✅ Scraped {len(raw_jobs)} jobs successfully")
+    with open(all_jobs_file, 'wb', buffering=1 << 20) as out:
+        await asyncio.gather(
+            *(scrape(i, url) for i, url in enumerate(all_urls, 1)), return_exceptions=True
+        )
+    await greenhouse_scraper.aclose()
+    
+    print(f"\n  ✅ Scraped {scraped} jobs successfully")
     
     # ========================================================================
     # SHOW RAW OUTPUT (for testing)
@@ -113,14 +135,13 @@ async def main():
         sample_file = settings.RAW_DATA_DIR / 'sample_job_output.json'
         sample_file.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(sample_file, 'w', encoding='utf-8') as f:
-            json.dump(sample_job, f, indent=2, ensure_ascii=False)
+        sample_file.write_bytes(json_dumps(sample_job, indent=True))
         
         print(f"\n  💾 Full sample saved to: {sample_file}")
         
         # Show structure of all jobs
         print(f"\n[ALL JOBS STRUCTURE]")
-        for i, job in enumerate(raw_jobs[:5], 1):  # Show first 5
+        for i, job in enumerate(raw_jobs, 1):  # Show first 5
             print(f"\n  Job {i}:")
             print(f"    Title: {job.get('title', 'N/A')}")
             print(f"    Company: {job.get('company', 'N/A')}")
@@ -131,13 +152,8 @@ async def main():
             html = job.get('html_content', job.get('description', ''))
             print(f"    HTML Size: {len(html)} chars")
         
-        if len(raw_jobs) > 5:
-            print(f"\n  ... and {len(raw_jobs) - 5} more jobs")
-    
-    # Save all raw jobs to local JSON for inspection
-    all_jobs_file = settings.RAW_DATA_DIR / f'all_raw_jobs_{job_title.replace(" ", "_")}.json'
-    with open(all_jobs_file, 'w', encoding='utf-8') as f:
-        json.dump(raw_jobs, f, indent=2, ensure_ascii=False)
+        if scraped > 5:
+            print(f"\n  ... and {scraped - 5} more jobs")
     
     print(f"\n  💾 All raw jobs saved to: {all_jobs_file}")
     
@@ -149,8 +165,8 @@ async def main():
     print("=" * 80)
     print(f"📊 RESULTS:")
     print(f"  URLs Found: {total_urls}")
-    print(f"  Jobs Scraped: {len(raw_jobs)}")
-    print(f"  Success Rate: {len(raw_jobs)/total_urls*100:.1f}%")
+    print(f"  Jobs Scraped: {scraped}")
+    print(f"  Success Rate: {scraped/total_urls*100:.1f}%")
     
     print(f"\n📁 LOCAL FILES (for inspection):")
     print(f"  Sample Job: {sample_file}")
@@ -14,7 +14,7 @@ GREENHOUSE_COMPANIES = [
     # Fintech
     "brex", "ramp", "mercury", "gusto", "rippling",
     "affirm", "carta", "checkr", "chime", "wealthfront",
-    "betterment", "acorns", "stash", "robinhood", "sofi",
+    "betterment", "acorns", "stash", "sofi",
     "current", "varo", "dave", "brigit", "earnin",
     "lendingclub", "upstart", "avant", "prosper", "fundbox",
     "kabbage", "ondeck", "funding-circle", "bluevine", "nav",
@@ -26,22 +26,22 @@ GREENHOUSE_COMPANIES = [
     "kronos", "ultimate-software", "sap-successfactors", "oracle-hcm", "workday-hcm",
     
     # Developer Tools & Infrastructure
-    "github", "gitlab", "hashicorp", "docker", "kubernetes",
+    "github", "hashicorp", "docker", "kubernetes",
     "terraform", "ansible", "puppet", "chef", "jenkins",
-    "circleci", "travis-ci", "buildkite", "netlify", "vercel",
+    "circleci", "travis-ci", "buildkite", "netlify",
     "cloudflare", "fastly", "akamai", "cloudinary", "imgix",
     
     # Cloud & Data Infrastructure
     "snowflake", "confluent", "cockroachdb", "timescale", "redis",
-    "mongodb", "elastic", "databricks", "fivetran", "airbyte",
+    "mongodb", "elastic", "fivetran", "airbyte",
     "dbt", "census", "hightouch", "rudderstack", "mparticle",
-    "segment", "amplitude", "mixpanel", "heap", "pendo",
+    "mixpanel", "heap", "pendo",
     
     # AI/ML Companies
     "anthropic", "openai", "cohere", "huggingface", "replicate",
     "scale", "labelbox", "snorkel", "weights-biases", "wandb",
     "anyscale", "modal", "together-ai", "fireworks-ai", "runpod",
-    "baseten", "banana-dev", "mystic-ai", "steamship", "replicate",
+    "baseten", "banana-dev", "mystic-ai", "steamship",
     
     # Security & Compliance
     "okta", "auth0", "1password", "bitwarden", "lastpass",
@@ -51,7 +51,7 @@ GREENHOUSE_COMPANIES = [
     
     # Healthcare & Biotech
     "oscar", "devoted-health", "cityblock", "carbon-health", "forward",
-    "benchling", "ginkgo-bioworks", "recursion", "insitro", "relay-therapeutics",
+    "ginkgo-bioworks", "recursion", "insitro", "relay-therapeutics",
     "schrodinger", "absci", "zymergen", "transcriptic", "emerald-cloud-lab",
     "tempus", "flatiron-health", "color", "23andme", "helix",
     
@@ -92,38 +92,38 @@ GREENHOUSE_COMPANIES = [
     "stord", "shipmonk", "red-stag", "rakuten", "whiplash",
     
     # Marketing & Advertising
-    "hubspot", "marketo", "mailchimp", "sendgrid", "twilio",
-    "attentive", "klaviyo", "braze", "customer-io", "iterable",
+    "hubspot", "marketo", "sendgrid", "twilio",
+    "braze", "customer-io", "iterable",
     "sendbird", "stream", "pusher", "ably", "pubnub",
-    "segment", "rudderstack", "mparticle", "tealium", "lytics",
+    "tealium", "lytics",
     
     # Sales & CRM
-    "salesforce", "hubspot", "pipedrive", "copper", "close",
+    "salesforce", "pipedrive", "copper", "close",
     "apollo", "zoominfo", "clearbit", "6sense", "demandbase",
     "outreach", "salesloft", "groove", "yesware", "mixmax",
     "lemlist", "reply-io", "woodpecker", "mailshake", "snov-io",
     
     # Product & Analytics
-    "productboard", "pendo", "amplitude", "mixpanel", "heap",
+    "productboard",
     "fullstory", "logrocket", "hotjar", "crazy-egg", "mouseflow",
     "sprig", "usertesting", "userlytics", "validately", "userzoom",
     "dovetail", "handrail", "maze", "optimal-workshop", "lookback",
     
     # Design & Creative
-    "figma", "sketch", "invision", "abstract", "zeplin",
-    "canva", "adobe", "autodesk", "blender", "unity",
-    "framer", "webflow", "bubble", "retool", "internal",
+    "sketch", "invision", "abstract", "zeplin",
+    "adobe", "autodesk", "blender",
+    "framer", "bubble", "internal",
     "airplane", "superblocks", "clutch", "plasmic", "builder-io",
     
     # Collaboration & Productivity
-    "slack", "zoom", "miro", "notion", "coda",
-    "airtable", "clickup", "monday", "asana", "linear",
+    "slack", "zoom",
+    "clickup", "monday",
     "height", "shortcut", "jira", "trello", "basecamp",
     "todoist", "any-do", "things", "omnifocus", "ticktick",
     
     # Customer Support
     "zendesk", "freshdesk", "intercom", "drift", "front",
-    "helpscout", "kustomer", "gladly", "gorgias", "re-amaze",
+    "helpscout", "kustomer", "gladly", "re-amaze",
     "help-crunch", "crisp", "tawk-to", "livechat", "olark",
     "userlike", "pure-chat", "tidio", "smartsupp", "jivochat",
     
@@ -138,12 +138,12 @@ GREENHOUSE_COMPANIES = [
     "openly", "kin", "slide", "sure", "ladder",
     
     # Construction Tech
-    "procore", "autodesk", "plangrid", "fieldwire", "buildertrend",
+    "procore", "plangrid", "fieldwire", "buildertrend",
     "buildr", "mosaic", "trunk-tools", "slate", "join",
     "esub", "raken", "busybusy", "rhumbix", "constrafor",
     
     # Food & Agriculture
-    "doordash", "ubereats", "grubhub", "instacart", "gopuff",
+    "ubereats", "grubhub",
     "impossible-foods", "beyond-meat", "apeel", "plenty", "bowery",
     "aerofarms", "gotham-greens", "brightfarms", "RevOL-greens", "kalera",
     "farmers-business-network", "indigo-ag", "granular", "climate-fieldview", "agworld",
@@ -154,8 +154,8 @@ GREENHOUSE_COMPANIES = [
     "hotels-com", "agoda", "hostelworld", "homestay", "couchsurfing",
     
     # Blockchain & Crypto
-    "coinbase", "kraken", "gemini", "binance-us", "bittrex",
-    "blockchain", "chainalysis", "elliptic", "coinbase", "circle",
+    "kraken", "gemini", "binance-us", "bittrex",
+    "blockchain", "chainalysis", "elliptic", "circle",
     "anchorage", "fireblocks", "ledger", "trezor", "metamask",
     
     # Remote Work
@@ -163,22 +163,20 @@ GREENHOUSE_COMPANIES = [
     "velocity-global", "globalization-partners", "safeguard-global", "atlas", "multiplier",
     
     # HR & Recruiting
-    "greenhouse", "lever", "ashby", "gem", "dover",
-    "hired", "triplebyte", "karat", "interviewing-io", "hired",
+    "ashby", "gem", "dover",
+    "hired", "triplebyte", "karat", "interviewing-io",
     "vettery", "angellist", "wellfound", "ycombinator", "techstars",
     
     # Additional Startups
-    "faire", "whatnot", "clubhouse", "superhuman", "loom",
+    "clubhouse", "superhuman", "loom",
     "mmhmm", "around", "tandem", "tuple", "descript",
     "riverside", "streamyard", "restream", "socialive", "vimeo",
     
     # More Companies
     "algolia", "meilisearch", "typesense", "elasticsearch", "opensearch",
     "pinecone", "weaviate", "qdrant", "milvus", "chroma",
-    "cohere", "ai21", "aleph-alpha", "stability-ai", "midjourney"
+    "ai21", "aleph-alpha", "stability-ai", "midjourney"
 ]
 
-# Remove any duplicates and sort alphabetically
-GREENHOUSE_COMPANIES = sorted(list(set(GREENHOUSE_COMPANIES)))
-
-print(f"✅ Loaded {len(GREENHOUSE_COMPANIES)} Greenhouse companies")
+# Entries above are unique; keep the alphabetical order callers iterate in
+GREENHOUSE_COMPANIES = tuple(sorted(GREENHOUSE_COMPANIES))
@@ -1,24 +1,92 @@
 """
 AWS Bedrock extractor for job data
 """
-import json
+import asyncio
+import functools
+import hashlib
+import html
+import os
+import re
 import boto3
-from typing import Dict, Optional
+from bs4 import BeautifulSoup
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from config import settings
+from src.parsers.skill_extractor import SkillExtractor
+from src.utils.helpers import json_dumps, json_loads
+
+
+JOB_SCHEMA = """{
+    "id": "unique job identifier (extract from URL or generate)",
+    "title": "job title",
+    "company": "company name",
+    "location": "job location (city, state, country or 'Remote')",
+    "date_posted": "date posted (in ISO format YYYY-MM-DD if available, or empty string)",
+    "salary_low": minimum salary as number (or null if not specified),
+    "salary_high": maximum salary as number (or null if not specified),
+    "description": "clean text description without HTML tags (first 2000 characters)",
+    "listed_skills": ["skill1", "skill2", "skill3"] (extract technical skills mentioned)
+}"""
+
+JSON_LD_RE = re.compile(r'<script[^>]+application/ld\+json[^>]*>(.*?)</script>', re.S | re.I)
+
+# Characters of posting text sent per job
+PROMPT_TEXT_LIMIT = 8000
+
+# Static tail of the single-job prompt, formatted once at import rather than per call
+EXTRACTION_INSTRUCTIONS = f"""Extract the following information and return it as a valid JSON object:
+
+{JOB_SCHEMA}
+
+IMPORTANT RULES:
+1. Return ONLY valid JSON, no additional text
+2. Extract actual data from the posting, don't make up information
+3. If a field is not found, use null for numbers, empty string for text, or empty array for lists
+4. For skills, extract programming languages, frameworks, tools, and technologies mentioned
+5. For salary, extract numbers only (remove currency symbols and convert k/K notation to thousands)
+6. Clean the description by removing HTML tags and extra whitespace
+
+Return only the JSON object:"""
+
+# Sized above BedrockBatchExtractor's default worker count so threads never queue on the pool
+MAX_POOL_CONNECTIONS = 64
+
+
+@functools.lru_cache(maxsize=None)
+def get_bedrock_client():
+    """Process-wide Bedrock client, so extractors share one connection pool and credentials"""
+    return boto3.client(
+        service_name='bedrock-runtime',
+        region_name=settings.BEDROCK_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        # Adaptive retries back off client-side when Bedrock throttles, so a
+        # ThrottlingException only reaches the extractor once retries run out
+        config=Config(max_pool_connections=MAX_POOL_CONNECTIONS, read_timeout=120,
+                      retries={'max_attempts': 8, 'mode': 'adaptive'})
+    )
 
 
 class BedrockExtractor:
     """Extract structured job data using AWS Bedrock"""
     
+    # Bump when the prompt changes so cached extractions from the old prompt are not reused
+    PROMPT_VERSION = 2
+    # Postings per multi-job call; bounded by the 4000-token output ceiling
+    # (~700 tokens per extracted job), not by the input context
+    MAX_JOBS_PER_CALL = 4
+    
     def __init__(self):
         """Initialize Bedrock client"""
-        self.bedrock = boto3.client(
-            service_name='bedrock-runtime',
-            region_name=settings.BEDROCK_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
+        self.bedrock = get_bedrock_client()
         self.model_id = settings.BEDROCK_MODEL_ID
+        # Cleared on the first AccessDenied from the streaming API (see _invoke)
+        self.stream_responses = True
+        self.cache_dir = settings.DATA_DIR / 'bedrock_cache'
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
     
     def extract_job_data(self, raw_job: Dict) -> Optional[Dict]:
         """
@@ -30,87 +98,367 @@ class BedrockExtractor:
         Returns:
             Dictionary with extracted structured data
         """
-        html_content = raw_job.get('html_content', raw_job.get('description', ''))
         url = raw_job.get('url', '')
+        local_result, text, cache_path = self._prepare(raw_job)
+        if text is None:
+            return local_result
         
-        # Create prompt for Bedrock
-        prompt = self._create_extraction_prompt(html_content, url)
+        # Create prompt for Bedrock from the posting text, not its markup
+        prompt = self._create_extraction_prompt(text, url)
         
         try:
-            # Call Bedrock API
-            response = self.bedrock.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 4000,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.1,
-                    "top_p": 0.9
-                })
-            )
-            
-            # Parse response
-            response_body = json.loads(response['body'].read())
-            extracted_text = response_body['content'][0]['text']
-            
             # Parse JSON from response
-            extracted_data = json.loads(extracted_text)
+            extracted_data = json_loads(self._invoke(prompt))
+            if not isinstance(extracted_data, dict):
+                raise ValueError("expected a JSON object")
             
             # Add original URL
             extracted_data['url'] = url
             
+            self._cache_put(cache_path, extracted_data)
             return extracted_data
             
+        except (ClientError, BotoCoreError, ValueError, OSError) as e:
+            print(f"      ✗ Bedrock extraction failed: {self._describe_error(e)}")
+            return None
+    
+    def extract_multi(self, raw_jobs: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Extract several postings with a single Bedrock call
+        
+        Cached postings are answered from the cache; the rest share one prompt
+        and come back as a JSON array. If the array is malformed or the wrong
+        length, the uncached postings are retried one by one.
+        
+        Args:
+            raw_jobs: Raw job dictionaries (at most MAX_JOBS_PER_CALL)
+            
+        Returns:
+            Extracted dictionaries aligned with raw_jobs (None where extraction failed)
+        """
+        results: List[Optional[Dict]] = [None] * len(raw_jobs)
+        pending = []
+        
+        for i, raw_job in enumerate(raw_jobs):
+            results[i], text, cache_path = self._prepare(raw_job)
+            if text is not None:
+                pending.append((i, raw_job.get('url', ''), text, cache_path))
+        
+        if len(pending) <= 1:
+            for i, *_ in pending:
+                results[i] = self.extract_job_data(raw_jobs[i])
+            return results
+        
+        try:
+            items = json_loads(self._invoke(
+                self._create_multi_extraction_prompt([(url, text) for _, url, text, _ in pending])
+            ))
+            if not isinstance(items, list) or len(items) != len(pending):
+                raise ValueError(f"expected a JSON array of {len(pending)} objects")
+        except (ClientError, BotoCoreError, ValueError) as e:
+            print(f"      ✗ Multi-job extraction failed, retrying one by one: {self._describe_error(e)}")
+            items = [None] * len(pending)
+        
+        for (i, url, _, cache_path), extracted_data in zip(pending, items):
+            if isinstance(extracted_data, dict):
+                extracted_data['url'] = url
+                try:
+                    self._cache_put(cache_path, extracted_data)
+                except OSError as e:
+                    print(f"      ✗ Could not cache extraction for {url}: {self._describe_error(e)}")
+                results[i] = extracted_data
+            else:
+                results[i] = self.extract_job_data(raw_jobs[i])
+        
+        return results
+    
+    def _prepare(self, raw_job: Dict) -> Tuple[Optional[Dict], Optional[str], Optional[Path]]:
+        """
+        Answer a posting locally when possible, else get it ready for a model call
+        
+        Pages that embed a JobPosting block are already structured, and identical
+        postings from earlier runs are in the cache; neither needs Bedrock. Any
+        failure here is logged and the posting is skipped, never raised.
+        
+        Returns:
+            (result, text, cache_path): result is set when JSON-LD or the cache
+            answered; otherwise text and cache_path are set for a Bedrock call.
+            All three are None if the posting could not be prepared.
+        """
+        url = raw_job.get('url', '')
+        try:
+            html_content = raw_job.get('html_content', raw_job.get('description', '')) or ''
+            structured = self._from_json_ld(html_content, url)
+            if structured is not None:
+                return structured, None, None
+            
+            text = self._clean_html(html_content)
+            # Same key for single and multi-job runs, so they share the cache
+            cache_path = self._cache_path(self._create_extraction_prompt(text, url))
+            if cache_path.exists():
+                try:
+                    return json_loads(cache_path.read_bytes()), None, None
+                except ValueError:
+                    pass  # corrupt entry; extract again and overwrite it
+            return None, text, cache_path
         except Exception as e:
-            print(f"      ✗ Bedrock extraction failed: {str(e)[:100]}")
+            print(f"      ✗ Could not prepare {url}: {self._describe_error(e)}")
+            return None, None, None
+    
+    def _invoke(self, prompt: str) -> str:
+        """
+        Call Bedrock with a single user message and return the response text
+        
+        The response is streamed; reading stops as soon as the accumulated text
+        is complete JSON, without waiting for the trailing end-of-message events.
+        Streaming needs the bedrock:InvokeModelWithResponseStream IAM action; if
+        the role only allows bedrock:InvokeModel, the first AccessDenied switches
+        this extractor to plain invoke_model calls.
+        """
+        body = json_dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 4000,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.1,
+            "top_p": 0.9
+        })
+        
+        if self.stream_responses:
+            try:
+                response = self.bedrock.invoke_model_with_response_stream(modelId=self.model_id, body=body)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'AccessDeniedException':
+                    raise
+                print(f"      ⚠️  Streaming not permitted ({self._describe_error(e)}); using InvokeModel")
+                self.stream_responses = False
+            else:
+                return self._read_stream(response['body'])
+        
+        response = self.bedrock.invoke_model(modelId=self.model_id, body=body)
+        return json_loads(response['body'].read())['content'][0]['text']
+    
+    @staticmethod
+    def _read_stream(stream) -> str:
+        """Accumulate streamed text deltas, returning early once they form complete JSON"""
+        parts = []
+        try:
+            for event in stream:
+                chunk = json_loads(event['chunk']['bytes'])
+                if chunk.get('type') != 'content_block_delta':
+                    continue
+                text = chunk['delta'].get('text', '')
+                parts.append(text)
+                if text.rstrip().endswith(('}', ']')):
+                    extracted_text = ''.join(parts)
+                    try:
+                        json_loads(extracted_text)
+                        return extracted_text
+                    except ValueError:
+                        pass
+        finally:
+            stream.close()
+        
+        return ''.join(parts)
+    
+    def _cache_path(self, prompt: str):
+        """Cache file for a prompt; keyed by model and prompt version as well as content"""
+        key = hashlib.sha256(f"{self.model_id}\n{self.PROMPT_VERSION}\n{prompt}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.json"
+    
+    def _cache_put(self, cache_path, extracted_data: Dict):
+        """Write a cache entry atomically so concurrent workers never read a partial file"""
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{id(extracted_data)}.tmp")
+        tmp_path.write_bytes(json_dumps(extracted_data))
+        os.replace(tmp_path, cache_path)
+    
+    @staticmethod
+    def _describe_error(e: Exception) -> str:
+        """Error summary that leads with the AWS error code, so throttling stays visible"""
+        if isinstance(e, ClientError):
+            error = e.response.get('Error', {})
+            return f"{error.get('Code', 'ClientError')}: {error.get('Message', '')[:200]}"
+        return f"{type(e).__name__}: {str(e)[:200]}"
+    
+    @classmethod
+    def _from_json_ld(cls, html_content: str, url: str) -> Optional[Dict]:
+        """
+        Map an embedded schema.org JobPosting block onto the extraction schema
+        
+        Returns:
+            Extracted dictionary, or None when the page has no usable JobPosting
+        """
+        if 'ld+json' not in html_content:
             return None
+        for match in JSON_LD_RE.finditer(html_content):
+            try:
+                data = json_loads(match.group(1).strip())
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                data = data.get('@graph', [data])
+            for item in data if isinstance(data, list) else []:
+                types = item.get('@type') if isinstance(item, dict) else None
+                if 'JobPosting' not in (types if isinstance(types, list) else [types]):
+                    continue
+                # A block without a title and description is too thin to trust
+                # over the model; let Bedrock read the page instead
+                if item.get('title') and item.get('description'):
+                    # Publishers bend the schema freely; a block that doesn't map
+                    # falls through to Bedrock instead of failing the extraction
+                    try:
+                        return cls._map_job_posting(item, url)
+                    except (AttributeError, TypeError, ValueError):
+                        return None
+        return None
+    
+    @classmethod
+    def _map_job_posting(cls, posting: Dict, url: str) -> Dict:
+        """Translate schema.org JobPosting fields into the JOB_SCHEMA layout"""
+        def first(value):
+            # Most JobPosting properties may be a single value or a list of them
+            return (value[0] if value else None) if isinstance(value, list) else value
+        
+        def text(value) -> str:
+            value = first(value)
+            if isinstance(value, dict):
+                value = value.get('name') or value.get('value') or ''
+            return str(value) if value is not None else ''
+        
+        def number(value):
+            value = first(value)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value
+            try:
+                return float(str(value).replace(',', ''))
+            except ValueError:
+                return None
+        
+        locations = posting.get('jobLocation') or []
+        if not isinstance(locations, list):
+            locations = [locations]
+        places = []
+        for loc in locations:
+            address = loc.get('address') if isinstance(loc, dict) else loc
+            address = first(address)
+            if isinstance(address, dict):
+                parts = [text(address.get(key)) for key in ('addressLocality', 'addressRegion', 'addressCountry')]
+                places.append(', '.join(p for p in parts if p))
+            elif address:
+                places.append(str(address))
+        location = '; '.join(p for p in places if p)
+        if not location and text(posting.get('jobLocationType')) == 'TELECOMMUTE':
+            location = 'Remote'
+        
+        salary = first(posting.get('baseSalary'))
+        salary = first(salary.get('value')) if isinstance(salary, dict) else salary
+        if not isinstance(salary, dict):
+            salary = {'minValue': salary, 'maxValue': salary}
+        
+        # A PropertyValue identifier names its issuer in 'name'; the id is 'value'
+        identifier = first(posting.get('identifier'))
+        identifier = text(identifier.get('value')) if isinstance(identifier, dict) else text(identifier)
+        
+        description = cls._clean_html(text(posting.get('description')))[:2000]
+        skills = posting.get('skills') or []
+        if isinstance(skills, str):
+            skills = [s.strip() for s in skills.split(',') if s.strip()]
+        elif isinstance(skills, list):
+            skills = [text(s) for s in skills if text(s)]
+        else:
+            skills = []
+        
+        return {
+            'id': identifier or url.rstrip('/').rsplit('/', 1)[-1],
+            'title': text(posting.get('title')),
+            'company': text(posting.get('hiringOrganization')),
+            'location': location,
+            'date_posted': text(posting.get('datePosted'))[:10],
+            'salary_low': number(salary.get('minValue')),
+            'salary_high': number(salary.get('maxValue')),
+            'description': description,
+            'listed_skills': skills or SkillExtractor.extract(description),
+            'url': url,
+        }
+    
+    @staticmethod
+    def _clean_html(html_content: str) -> str:
+        """
+        Reduce posting HTML to its visible text
+        
+        Scripts, styles and tags are input tokens with no information for the
+        model. Greenhouse API content arrives entity-escaped (no literal '<'),
+        so only that form is unescaped before parsing; in ordinary HTML the
+        parser decodes entities itself, and escaped text such as "&lt;div&gt;"
+        stays text. Falls back to the original string if parsing fails.
+        """
+        try:
+            if '<' not in html_content:
+                html_content = html.unescape(html_content)
+            soup = BeautifulSoup(html_content, 'lxml')
+            for tag in soup(['script', 'style', 'noscript']):
+                tag.decompose()
+            return ' '.join(soup.get_text(' ').split())
+        except Exception:
+            return html_content
     
     def _create_extraction_prompt(self, html_content: str, url: str) -> str:
         """
         Create extraction prompt for Bedrock
         
         Args:
-            html_content: Raw HTML content
+            html_content: Posting text (markup already stripped)
             url: Job URL
             
         Returns:
             Formatted prompt string
         """
-        prompt = f"""You are a job data extraction expert. Extract structured information from the following job posting HTML.
+        # Only the URL and posting text vary; the instructions are a prebuilt constant
+        return f"""You are a job data extraction expert. Extract structured information from the following job posting.
 
 Job URL: {url}
 
-HTML Content:
-{html_content[:15000]}
+Posting Content:
+{html_content[:PROMPT_TEXT_LIMIT]}
 
-Extract the following information and return it as a valid JSON object:
+{EXTRACTION_INSTRUCTIONS}"""
+    
+    def _create_multi_extraction_prompt(self, postings: List[Tuple[str, str]]) -> str:
+        """
+        Create a prompt that extracts several postings at once
+        
+        Args:
+            postings: (url, posting text) pairs, markup already stripped
+            
+        Returns:
+            Formatted prompt string
+        """
+        jobs = "\n\n".join(
+            f"---JOB {i}---\nJob URL: {url}\n\nPosting Content:\n{text[:PROMPT_TEXT_LIMIT]}"
+            for i, (url, text) in enumerate(postings, 1)
+        )
+        
+        prompt = f"""You are a job data extraction expert. Extract structured information from each of the following {len(postings)} job postings.
 
-{{
-    "id": "unique job identifier (extract from URL or generate)",
-    "title": "job title",
-    "company": "company name",
-    "location": "job location (city, state, country or 'Remote')",
-    "date_posted": "date posted (in ISO format YYYY-MM-DD if available, or empty string)",
-    "salary_low": minimum salary as number (or null if not specified),
-    "salary_high": maximum salary as number (or null if not specified),
-    "description": "clean text description without HTML tags (first 2000 characters)",
-    "listed_skills": ["skill1", "skill2", "skill3"] (extract technical skills mentioned)
-}}
+{jobs}
+
+For EACH job, extract the following information as a JSON object:
+
+{JOB_SCHEMA}
 
 IMPORTANT RULES:
-1. Return ONLY valid JSON, no additional text
-2. Extract actual data from the HTML, don't make up information
+1. Return ONLY a valid JSON array of exactly {len(postings)} objects, one per job, in the same order (JOB 1 first), no additional text
+2. Extract actual data from each posting, don't make up information or mix data between jobs
 3. If a field is not found, use null for numbers, empty string for text, or empty array for lists
 4. For skills, extract programming languages, frameworks, tools, and technologies mentioned
 5. For salary, extract numbers only (remove currency symbols and convert k/K notation to thousands)
 6. Clean the description by removing HTML tags and extra whitespace
 
-Return only the JSON object:"""
+Return only the JSON array:"""
         
         return prompt
 
@@ -118,45 +466,50 @@ Return only the JSON object:"""
 class BedrockBatchExtractor:
     """Batch process multiple jobs with Bedrock"""
     
-    def __init__(self):
-        """Initialize extractor"""
+    def __init__(self, max_workers: int = 32):
+        """Initialize extractor and its private thread pool"""
         self.extractor = BedrockExtractor()
+        # Own pool rather than the loop's default executor, which is small and shared
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bedrock")
+    
+    async def extract_one(self, raw_job: Dict) -> Optional[Dict]:
+        """Extract a single job without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        # Run in thread pool since boto3 is synchronous
+        return await loop.run_in_executor(self._pool, self.extractor.extract_job_data, raw_job)
+    
+    async def extract_group(self, raw_jobs: List[Dict]) -> List[Optional[Dict]]:
+        """Extract up to MAX_JOBS_PER_CALL jobs with one Bedrock call, off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.extractor.extract_multi, raw_jobs)
+    
+    async def aclose(self):
+        """Shut down the worker pool"""
+        self._pool.shutdown(wait=True)
     
-    async def extract_batch(self, raw_jobs: list, batch_size: int = 5) -> list:
+    async def extract_batch(self, raw_jobs: list, batch_size: int = 5,
+                            jobs_per_call: int = BedrockExtractor.MAX_JOBS_PER_CALL) -> list:
         """
         Extract data from multiple jobs
         
         Args:
             raw_jobs: List of raw job dictionaries
-            batch_size: Number of concurrent extractions
+            batch_size: Number of concurrent Bedrock calls
+            jobs_per_call: Postings packed into each call (1 = one call per job)
             
         Returns:
             List of extracted job dictionaries
         """
-        import asyncio
+        # A slot frees up as soon as any call returns, so one slow call no longer
+        # holds back the rest of its batch
+        sem = asyncio.Semaphore(batch_size)
+        groups = [raw_jobs[i:i + jobs_per_call] for i in range(0, len(raw_jobs), jobs_per_call)]
         
-        extracted_jobs = []
+        async def extract_group(group):
+            async with sem:
+                return await self.extract_group(group)
         
-        for i in range(0, len(raw_jobs), batch_size):
-            batch = raw_jobs[i:i + batch_size]
-            
-            # Process batch
-            tasks = []
-            for job in batch:
-                # Run in thread pool since boto3 is synchronous
-                task = asyncio.get_event_loop().run_in_executor(
-                    None, 
-                    self.extractor.extract_job_data, 
-                    job
-                )
-                tasks.append(task)
-            
-            # Wait for batch to complete
-            batch_results = await asyncio.gather(*tasks)
-            
-            # Add successful extractions
-            for result in batch_results:
-                if result:
-                    extracted_jobs.append(result)
+        results = await asyncio.gather(*(extract_group(group) for group in groups))
         
-        return extracted_jobs
+        # Keep successful extractions
+        return [result for group in results for result in group if result]
@@ -1,6 +1,7 @@
 """
 Extract skills from job descriptions
 """
+import re
 from typing import List
 
 
@@ -27,11 +28,15 @@ class SkillExtractor:
         Returns:
             List of found skills
         """
-        found_skills = []
-        description_lower = description.lower()
-        
-        for skill in cls.COMMON_SKILLS:
-            if skill.lower() in description_lower:
-                found_skills.append(skill)
-        
-        return list(set(found_skills))
+        found = {_SKILL_NAMES[m.group(1).lower()] for m in _SKILL_PATTERN.finditer(description)}
+        return list(found)
+
+
+# One case-insensitive alternation scans the text once instead of once per skill.
+# Longest names first, and lookarounds rather than \b so "C++" and "A/B Testing"
+# still match while "R" and "Go" no longer match inside other words.
+_SKILL_NAMES = {skill.lower(): skill for skill in SkillExtractor.COMMON_SKILLS}
+_SKILL_PATTERN = re.compile(
+    r"(?<!\w)(" + "|".join(re.escape(s) for s in sorted(SkillExtractor.COMMON_SKILLS, key=len, reverse=True)) + r")(?!\w)",
+    re.IGNORECASE,
+)
@@ -1,9 +1,35 @@
 """
 Greenhouse scraper with flexible search options
 """
+import asyncio
+import importlib.util
+import os
+import random
+import time
 import httpx
-from typing import List
+from typing import List, Optional
 import re
+from config import settings
+from src.utils.helpers import json_dumps, json_loads
+
+# Board API requests in flight at once during a company scan
+MAX_BOARD_REQUESTS = 20
+
+# HTTP/2 multiplexes requests over fewer connections; httpx needs the h2 extra for it
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Seconds a cached board is served without asking Greenhouse; boards change
+# on the order of hours, and only the title/location filters differ between runs
+BOARD_CACHE_TTL = 3600
+
+# Retries for rate-limited (429) and transient server (5xx) responses or
+# connection errors, with exponential backoff plus jitter between attempts
+MAX_RETRIES = 3
+MAX_RETRY_DELAY = 30
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Board token and job id of a Greenhouse posting URL
+JOB_URL_RE = re.compile(r'greenhouse\.io/([^/]+)/jobs/(\d+)')
 
 
 class GreenhouseScraper:
@@ -13,8 +39,21 @@ class GreenhouseScraper:
         """Initialize with company list"""
         from src.data.greenhouse_companies import GREENHOUSE_COMPANIES
         self.companies = GREENHOUSE_COMPANIES
+        # One client for every request, so connections and TLS sessions are reused
+        self.client = httpx.AsyncClient(
+            timeout=15.0,
+            http2=HTTP2,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=50),
+        )
+        self._sem = asyncio.Semaphore(MAX_BOARD_REQUESTS)
+        self.cache_dir = settings.DATA_DIR / 'greenhouse_cache'
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         print(f"    📚 Loaded {len(self.companies)} companies to search")
     
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        await self.client.aclose()
+    
     async def get_all_job_urls(self, job_title: str, location: str, 
                                strict_location: bool = False) -> List[str]:
         """
@@ -31,19 +70,25 @@ class GreenhouseScraper:
         print(f"\n  [GREENHOUSE] Searching {len(self.companies)} company boards...")
         print(f"    Filters: title='{job_title}', location='{location}' (strict={strict_location})")
         
-        all_job_urls = []
+        # Insertion-ordered set: a posting listed on more than one board is kept once
+        all_job_urls = {}
         companies_with_jobs = 0
         total_jobs_before_filter = 0
         
-        for i, company in enumerate(self.companies, 1):
-            urls, jobs_found = await self._get_company_jobs(
-                company, job_title, location, strict_location
-            )
+        # Boards are scanned concurrently (bounded by the semaphore) and
+        # reported in the order they finish
+        tasks = [
+            asyncio.create_task(self._get_company_jobs(company, job_title, location, strict_location))
+            for company in self.companies
+        ]
+        
+        for i, future in enumerate(asyncio.as_completed(tasks), 1):
+            company, urls, jobs_found = await future
             
             total_jobs_before_filter += jobs_found
             
             if urls:
-                all_job_urls.extend(urls)
+                all_job_urls.update(dict.fromkeys(urls))
                 companies_with_jobs += 1
                 print(f"      [{i}/{len(self.companies)}] ✅ {company}: {len(urls)} jobs matched")
             
@@ -63,7 +108,7 @@ class GreenhouseScraper:
             print(f"       - Try leaving location blank")
             print(f"       - Try nearby cities")
         
-        return all_job_urls
+        return list(all_job_urls)
     
     async def _get_company_jobs(self, company: str, job_title: str, 
                                location: str, strict_location: bool) -> tuple:
@@ -71,63 +116,138 @@ class GreenhouseScraper:
         Get jobs from specific company
         
         Returns:
-            Tuple of (matching_job_urls, total_jobs_found)
+            Tuple of (company, matching_job_urls, total_jobs_found)
         """
-        api_url = f"https://boards-api.greenhouse.io/v1/boards/{company}/jobs?content=true"
-        
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(api_url)
-                
-                if response.status_code != 200:
-                    return [], 0
-                
-                data = response.json()
-                all_jobs = data.get('jobs', [])
-                job_urls = []
+            data = await self._fetch_board(company)
+            if data is None:
+                return company, [], 0
+            
+            all_jobs = data.get('jobs', [])
+            job_urls = []
+            
+            # Filter inputs are the same for every job on the board; casefold() is
+            # the caseless-matching form of lower() (e.g. "ß" matches "ss") at the same cost
+            title_filter = job_title.casefold() if job_title else ''
+            location_filter = location.casefold() if location else ''
+            location_parts = tuple(location_filter.replace(',', ' ').split())
+            
+            for job in all_jobs:
+                # Title match (always required)
+                if title_filter and title_filter not in (job.get('title') or '').casefold():
+                    continue
                 
-                for job in all_jobs:
-                    job_title_text = job.get('title', '').lower()
-                    job_location = job.get('location', {})
-                    job_location_text = job_location.get('name', '').lower() if isinstance(job_location, dict) else str(job_location).lower()
-                    
-                    # Title match (always required)
-                    title_match = job_title.lower() in job_title_text if job_title else True
+                # Location match (flexible)
+                if not location_filter:
+                    # No location filter - accept all
+                    location_match = True
+                else:
+                    job_location = job.get('location') or ''
+                    if isinstance(job_location, dict):
+                        job_location = job_location.get('name') or ''
+                    job_location_text = str(job_location).casefold()
                     
-                    if not title_match:
-                        continue
-                    
-                    # Location match (flexible)
-                    if not location:
-                        # No location filter - accept all
-                        location_match = True
-                    elif strict_location:
+                    if strict_location:
                         # Strict: must contain exact location
-                        location_match = location.lower() in job_location_text
+                        location_match = location_filter in job_location_text
                     else:
-                        # Flexible: match city, state, or 'remote'
-                        location_parts = location.lower().replace(',', ' ').split()
-                        location_match = any(part in job_location_text for part in location_parts)
-                        
-                        # Also accept remote jobs
-                        if 'remote' in job_location_text or 'anywhere' in job_location_text:
-                            location_match = True
-                    
-                    if location_match:
-                        absolute_url = job.get('absolute_url', '')
-                        
-                        # Only include valid greenhouse.io URLs
-                        if 'greenhouse.io' in absolute_url:
-                            job_urls.append(absolute_url)
-                
-                return job_urls, len(all_jobs)
+                        # Flexible: match city, state, or 'remote' (remote jobs always accepted)
+                        location_match = (
+                            any(part in job_location_text for part in location_parts)
+                            or 'remote' in job_location_text
+                            or 'anywhere' in job_location_text
+                        )
                 
+                if location_match:
+                    absolute_url = job.get('absolute_url', '')
+                    
+                    # Only include valid greenhouse.io URLs
+                    if 'greenhouse.io' in absolute_url:
+                        job_urls.append(absolute_url)
+            
+            return company, job_urls, len(all_jobs)
+            
         except Exception as e:
-            return [], 0
+            return company, [], 0
+    
+    async def _fetch_board(self, company: str) -> Optional[dict]:
+        """
+        Fetch a company's board JSON, served from the local cache while fresh
+        
+        Stale entries are revalidated with the stored ETag/Last-Modified, so an
+        unchanged board costs a 304 instead of the full payload.
+        
+        Returns:
+            Parsed board JSON, or None if the board could not be fetched
+        """
+        # Filtering needs only title, location and URL; parse_job fetches content for matches
+        api_url = f"https://boards-api.greenhouse.io/v1/boards/{company}/jobs"
+        body_path = self.cache_dir / f"{company}.json"
+        meta_path = self.cache_dir / f"{company}.meta.json"
+        
+        headers = {}
+        if body_path.exists():
+            if time.time() - body_path.stat().st_mtime < BOARD_CACHE_TTL:
+                return json_loads(body_path.read_bytes())
+            if meta_path.exists():
+                meta = json_loads(meta_path.read_bytes())
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
+        
+        async with self._sem:
+            response = await self._get(api_url, headers=headers)
+        
+        if response.status_code == 304 and body_path.exists():
+            os.utime(body_path)
+            return json_loads(body_path.read_bytes())
+        if response.status_code != 200:
+            return None
+        
+        self._cache_put(body_path, response.content)
+        self._cache_put(meta_path, json_dumps({
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+        }))
+        return json_loads(response.content)
+    
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET with retries on 429/5xx and connection errors
+        
+        Waits for the server's Retry-After when it gives one in seconds, else
+        2**attempt seconds plus jitter, capped at MAX_RETRY_DELAY. The last
+        response (or connection error) is returned/raised once retries run out.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = await self.client.get(url, **kwargs)
+            except httpx.TransportError:
+                if attempt == MAX_RETRIES:
+                    raise
+                response = None
+            
+            if response is not None and (response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES):
+                return response
+            
+            retry_after = response.headers.get('retry-after', '') if response is not None else ''
+            if retry_after.strip().isdigit():
+                delay = float(retry_after)
+            else:
+                delay = 2 ** attempt + random.uniform(0, 0.5)
+            await asyncio.sleep(min(delay, MAX_RETRY_DELAY))
+    
+    @staticmethod
+    def _cache_put(path, data: bytes):
+        """Write a cache file atomically so a concurrent run never reads a partial file"""
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
     
     async def parse_job(self, url: str) -> dict:
         """Parse individual job posting"""
-        match = re.search(r'greenhouse\.io/([^/]+)/jobs/(\d+)', url)
+        match = JOB_URL_RE.search(url)
         if not match:
             return None
         
@@ -137,25 +257,24 @@ class GreenhouseScraper:
         api_url = f"https://boards-api.greenhouse.io/v1/boards/{board_token}/jobs/{job_id}"
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(api_url)
-                
-                if response.status_code != 200:
-                    return None
-                
-                data = response.json()
-                
-                return {
-                    "id": str(data.get("id")),
-                    "title": data.get("title", ""),
-                    "company": board_token.replace("-", " ").title(),
-                    "location": data.get("location", {}).get("name", ""),
-                    "url": url,
-                    "date_posted": data.get("updated_at", ""),
-                    "salary_low": None,
-                    "salary_high": None,
-                    "description": data.get("content", ""),
-                    "listed_skills": []
-                }
+            response = await self._get(api_url, timeout=30.0)
+            
+            if response.status_code != 200:
+                return None
+            
+            data = json_loads(response.content)
+            
+            return {
+                "id": str(data.get("id")),
+                "title": data.get("title", ""),
+                "company": board_token.replace("-", " ").title(),
+                "location": data.get("location", {}).get("name", ""),
+                "url": url,
+                "date_posted": data.get("updated_at", ""),
+                "salary_low": None,
+                "salary_high": None,
+                "description": data.get("content", ""),
+                "listed_skills": []
+            }
         except Exception as e:
             return None
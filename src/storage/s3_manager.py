@@ -1,13 +1,35 @@
 """
-S3 storage manager - stores each URL as separate .txt file
+S3 storage manager - stores each run's job URLs as one JSON Lines file
 """
-import json
+import functools
+import gzip
+import io
 import boto3
+from botocore.config import Config
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pathlib import Path
 
 from config import settings
+from src.utils.helpers import json_dumps, json_loads
+
+
+# Connections in the shared client's pool, for callers issuing S3 requests from several threads
+MAX_WORKERS = 32
+
+# Job lists are stored as gzipped compact JSON; postings carry their HTML, which compresses ~5-10x
+GZIP_JSON_ARGS = {'ContentType': 'application/json', 'ContentEncoding': 'gzip'}
+
+
+@functools.lru_cache(maxsize=None)
+def get_s3_client():
+    """Process-wide S3 client, so managers share one connection pool and credentials"""
+    return boto3.client(
+        's3',
+        config=Config(max_pool_connections=MAX_WORKERS,
+                      retries={'max_attempts': 5, 'mode': 'adaptive'}),
+        **settings.get_boto3_config()
+    )
 
 
 class S3Manager:
@@ -15,116 +37,79 @@ class S3Manager:
     
     def __init__(self):
         """Initialize S3 client with credentials from settings"""
-        self.s3_client = boto3.client('s3', **settings.get_boto3_config())
+        self.s3_client = get_s3_client()
         self.bucket_name = settings.S3_BUCKET_NAME
     
     def upload_individual_links(self, job_links: Dict[str, List[str]], 
-                               job_title: str, location: str) -> List[str]:
+                               job_title: str, location: str,
+                               keep_local: bool = False) -> List[str]:
         """
-        Upload each job URL as a SEPARATE .txt file to S3
+        Upload all job URLs as ONE JSON Lines object to S3
+        
+        Each line is {"source": ..., "url": ..., "scraped_at": ...}. One object
+        replaces the old one-.txt-per-URL layout and its master index, so a run
+        costs a single PUT (and a single GET to read back) however many URLs it found.
         
         Args:
             job_links: Dictionary of job links by source
             job_title: Job title searched
             location: Location searched
+            keep_local: Also write the batch to RAW_DATA_DIR
             
         Returns:
-            List of S3 keys for uploaded files
+            List containing the S3 key of the uploaded batch
         """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safe_title = job_title.replace(" ", "_").lower() if job_title else "all"
         safe_location = location.replace(" ", "_").lower() if location else "all"
+        filename = f'job_links_{safe_title}_{safe_location}_{timestamp}.jsonl'
         
-        uploaded_keys = []
-        file_counter = 1
-        
-        print(f"\n  📤 Uploading individual URL files to S3...")
-        
-        for source, links in job_links.items():
-            for url in links:
-                # Create unique filename for each URL
-                filename = f'job_link_{safe_title}_{safe_location}_{timestamp}_{file_counter:04d}.txt'
-                local_path = settings.RAW_DATA_DIR / filename
-                local_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Write single URL to file
-                with open(local_path, 'w') as f:
-                    f.write(f"# Job Link #{file_counter}\n")
-                    f.write(f"# Source: {source}\n")
-                    f.write(f"# Scraped at: {datetime.now().isoformat()}\n\n")
-                    f.write(url)
-                
-                # Upload to S3
-                s3_key = f"{settings.S3_LINKS_PREFIX}{source}/{filename}"
-                self.s3_client.upload_file(str(local_path), self.bucket_name, s3_key)
-                uploaded_keys.append(s3_key)
-                
-                if file_counter % 10 == 0 or file_counter == len(links):
-                    print(f"    [{file_counter}/{sum(len(v) for v in job_links.values())}] Uploaded", end='\r')
-                
-                file_counter += 1
-        
-        print(f"\n  ✅ Uploaded {len(uploaded_keys)} individual URL files")
-        
-        # Also create a master index file
-        index_filename = f'job_links_index_{safe_title}_{safe_location}_{timestamp}.txt'
-        index_local_path = settings.RAW_DATA_DIR / index_filename
-        
-        with open(index_local_path, 'w') as f:
-            f.write(f"# Master Index - Job Links for {job_title} in {location}\n")
-            f.write(f"# Total URLs: {len(uploaded_keys)}\n")
-            f.write(f"# Scraped at: {datetime.now().isoformat()}\n\n")
-            
-            for key in uploaded_keys:
-                f.write(f"{key}\n")
+        print(f"\n  📤 Uploading job URLs to S3...")
         
-        index_s3_key = f"{settings.S3_LINKS_PREFIX}index_{safe_title}_{safe_location}_{timestamp}.txt"
-        self.s3_client.upload_file(str(index_local_path), self.bucket_name, index_s3_key)
+        scraped_at = datetime.now().isoformat()
+        lines = [
+            json_dumps({"source": source, "url": url, "scraped_at": scraped_at}) + b'\n'
+            for source, links in job_links.items() for url in links
+        ]
         
-        print(f"  ✅ Created master index: {index_s3_key}")
+        s3_key = f"{settings.S3_LINKS_PREFIX}batch_{safe_title}_{safe_location}_{timestamp}.jsonl"
+        self._put_bytes(b''.join(lines), s3_key,
+                        settings.RAW_DATA_DIR / filename if keep_local else None)
         
-        return uploaded_keys
+        print(f"  ✅ Uploaded {len(lines)} URLs to s3://{self.bucket_name}/{s3_key}")
+        
+        return [s3_key]
     
     def download_all_links(self, s3_keys: List[str]) -> List[str]:
         """
-        Download all URL files from S3
+        Download job URLs from JSON Lines batches in S3
         
         Args:
-            s3_keys: List of S3 keys to download
+            s3_keys: S3 keys of link batches (as returned by upload_individual_links)
             
         Returns:
             List of job URLs
         """
-        all_urls = []
-        
+        urls = []
         for s3_key in s3_keys:
-            local_path = settings.RAW_DATA_DIR / Path(s3_key).name
-            
             try:
-                self.s3_client.download_file(self.bucket_name, s3_key, str(local_path))
-                
-                with open(local_path, 'r') as f:
-                    lines = f.readlines()
-                    # Get the last non-empty line (the URL)
-                    for line in reversed(lines):
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            all_urls.append(line)
-                            break
+                body = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)['Body']
+                urls.extend(json_loads(line)['url'] for line in body.iter_lines() if line)
             except Exception as e:
                 print(f"    ⚠️  Failed to download {s3_key}: {e}")
         
-        return all_urls
+        return urls
     
     def upload_raw_jobs(self, raw_jobs: List[dict], 
-                       job_title: str, location: str) -> str:
+                       job_title: str, location: str, keep_local: bool = False) -> str:
         """
-        Upload RAW scraped job data to S3 as text/JSON (before cleaning)
+        Upload RAW scraped job data to S3 as gzipped JSON (before cleaning)
         
         Args:
             raw_jobs: List of raw job dictionaries
             job_title: Job title searched
             location: Location searched
+            keep_local: Also write the .json.gz file to RAW_DATA_DIR
             
         Returns:
             S3 key of uploaded file
@@ -132,17 +117,13 @@ class S3Manager:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safe_title = job_title.replace(" ", "_").lower() if job_title else "all"
         safe_location = location.replace(" ", "_").lower() if location else "all"
-        filename = f'raw_jobs_{safe_title}_{safe_location}_{timestamp}.json'
-        
-        local_path = settings.RAW_DATA_DIR / filename
-        local_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Write as JSON for easier parsing
-        with open(local_path, 'w', encoding='utf-8') as f:
-            json.dump(raw_jobs, f, indent=2, ensure_ascii=False)
+        filename = f'raw_jobs_{safe_title}_{safe_location}_{timestamp}.json.gz'
         
         s3_key = f"raw-jobs/{filename}"
-        self.s3_client.upload_file(str(local_path), self.bucket_name, s3_key)
+        # Write as JSON for easier parsing
+        self._put_bytes(gzip.compress(json_dumps(raw_jobs)), s3_key,
+                        settings.RAW_DATA_DIR / filename if keep_local else None,
+                        extra_args=GZIP_JSON_ARGS)
         
         print(f"✓ Uploaded {len(raw_jobs)} raw jobs to s3://{self.bucket_name}/{s3_key}")
         
@@ -158,25 +139,24 @@ class S3Manager:
         Returns:
             List of raw job dictionaries
         """
-        local_path = settings.RAW_DATA_DIR / 'downloaded_raw_jobs.json'
-        local_path.parent.mkdir(parents=True, exist_ok=True)
+        body = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)['Body'].read()
         
-        self.s3_client.download_file(self.bucket_name, s3_key, str(local_path))
+        # Uploads from before compression was added are plain JSON
+        if s3_key.endswith('.gz'):
+            body = gzip.decompress(body)
         
-        with open(local_path, 'r', encoding='utf-8') as f:
-            raw_jobs = json.load(f)
-        
-        return raw_jobs
+        return json_loads(body)
     
     def upload_jobs(self, jobs_data: List[dict], 
-                   job_title: str, location: str) -> str:
+                   job_title: str, location: str, keep_local: bool = False) -> str:
         """
-        Upload CLEANED/PROCESSED job data as JSON to S3
+        Upload CLEANED/PROCESSED job data as gzipped JSON to S3
         
         Args:
             jobs_data: List of cleaned job dictionaries
             job_title: Job title searched
             location: Location searched
+            keep_local: Also write the .json.gz file to PROCESSED_DATA_DIR
             
         Returns:
             S3 key of uploaded file
@@ -184,17 +164,21 @@ class S3Manager:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safe_title = job_title.replace(" ", "_").lower() if job_title else "all"
         safe_location = location.replace(" ", "_").lower() if location else "all"
-        filename = f'jobs_{safe_title}_{safe_location}_{timestamp}.json'
-        
-        local_path = settings.PROCESSED_DATA_DIR / filename
-        local_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(local_path, 'w', encoding='utf-8') as f:
-            json.dump(jobs_data, f, indent=2, ensure_ascii=False)
+        filename = f'jobs_{safe_title}_{safe_location}_{timestamp}.json.gz'
         
         s3_key = f"{settings.S3_JOBS_PREFIX}{filename}"
-        self.s3_client.upload_file(str(local_path), self.bucket_name, s3_key)
+        self._put_bytes(gzip.compress(json_dumps(jobs_data)), s3_key,
+                        settings.PROCESSED_DATA_DIR / filename if keep_local else None,
+                        extra_args=GZIP_JSON_ARGS)
         
         print(f"✓ Uploaded {len(jobs_data)} processed jobs to s3://{self.bucket_name}/{s3_key}")
         
         return s3_key
+    
+    def _put_bytes(self, data: bytes, s3_key: str, local_path: Optional[Path] = None,
+                   extra_args: Optional[dict] = None):
+        """Upload an in-memory payload, writing a local copy first only when a path is given"""
+        if local_path is not None:
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            local_path.write_bytes(data)
+        self.s3_client.upload_fileobj(io.BytesIO(data), self.bucket_name, s3_key, ExtraArgs=extra_args)
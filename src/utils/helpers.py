@@ -0,0 +1,29 @@
+"""
+Shared helper functions
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes without ASCII escaping
+    
+    Uses orjson when installed (much faster, and already produces bytes).
+    Non-string keys are stringified, as the stdlib fallback does.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def json_loads(data):
+    """Parse JSON from str or bytes; uses orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,6 +1,7 @@
 """
 Input validation utilities
 """
+import asyncio
 
 
 def get_user_input():
@@ -39,3 +40,14 @@ def get_user_input():
         print("   ✓ No location filter - searching ALL locations")
     
     return job_title, location, strict_location
+
+
+async def get_user_input_async():
+    """
+    get_user_input for async pipelines; the prompts run in a worker thread
+    so blocking input() never stalls the event loop
+    
+    Returns:
+        Tuple of (job_title, location, strict_location)
+    """
+    return await asyncio.to_thread(get_user_input)
@@ -1,4 +1,5 @@
 import boto3
+from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 import os
 
@@ -25,11 +26,12 @@ def test_aws_connection():
         for bucket in response['Buckets']:
             print(f"  - {bucket['Name']}")
         
-        # Test: Check if your job market bucket exists
+        # Test: Check if your job market bucket exists (probes just that bucket)
         bucket_name = os.getenv('S3_BUCKET_NAME')
-        if bucket_name in [b['Name'] for b in response['Buckets']]:
+        try:
+            s3_client.head_bucket(Bucket=bucket_name)
             print(f"\n✅ Found your bucket: {bucket_name}")
-        else:
+        except ClientError:
             print(f"\n❌ Bucket not found: {bucket_name}")
         
     except Exception as e:
@@ -0,0 +1,225 @@
+"""
+Tests for src.extractors
+"""
+import io
+
+import pytest
+from botocore.exceptions import ClientError
+
+from config import settings
+from src.extractors.bedrock_extrator import BedrockExtractor
+from src.utils.helpers import json_dumps
+
+URL = "https://boards.greenhouse.io/acme/jobs/12345"
+
+POSTING = {
+    "@context": "https://schema.org",
+    "@type": "JobPosting",
+    "title": "Data Scientist",
+    "description": "<p>Build models in Python and SQL.</p>",
+    "datePosted": "2025-10-01T09:00:00Z",
+    "hiringOrganization": {"@type": "Organization", "name": "Acme"},
+    "jobLocation": {
+        "@type": "Place",
+        "address": {"addressLocality": "New York", "addressRegion": "NY", "addressCountry": "US"},
+    },
+}
+
+
+def page(block) -> str:
+    return (f'<html><head><script type="application/ld+json">{json_dumps(block).decode()}</script>'
+            f'</head><body><h1>Data Scientist</h1></body></html>')
+
+
+def from_json_ld(block):
+    return BedrockExtractor._from_json_ld(page(block), URL)
+
+
+def test_maps_job_posting():
+    job = from_json_ld(POSTING)
+    assert job == {
+        'id': '12345',
+        'title': 'Data Scientist',
+        'company': 'Acme',
+        'location': 'New York, NY, US',
+        'date_posted': '2025-10-01',
+        'salary_low': None,
+        'salary_high': None,
+        'description': 'Build models in Python and SQL.',
+        'listed_skills': job['listed_skills'],
+        'url': URL,
+    }
+    assert sorted(job['listed_skills']) == ['Python', 'SQL']
+
+
+def test_graph_form():
+    block = {"@context": "https://schema.org",
+             "@graph": [{"@type": "Organization", "name": "Acme"}, dict(POSTING, **{"@context": None})]}
+    job = from_json_ld(block)
+    assert job['title'] == 'Data Scientist'
+    assert job['company'] == 'Acme'
+
+
+def test_list_valued_type():
+    job = from_json_ld(dict(POSTING, **{"@type": ["JobPosting", "Thing"]}))
+    assert job is not None
+    assert job['title'] == 'Data Scientist'
+
+
+def test_other_types_are_ignored():
+    assert from_json_ld(dict(POSTING, **{"@type": "Organization"})) is None
+
+
+@pytest.mark.parametrize("base_salary, low, high", [
+    ({"@type": "MonetaryAmount", "currency": "USD",
+      "value": {"@type": "QuantitativeValue", "minValue": 120000, "maxValue": 150000, "unitText": "YEAR"}},
+     120000, 150000),
+    ({"currency": "USD", "value": {"minValue": "120,000", "maxValue": "150,000.50"}}, 120000.0, 150000.5),
+    ({"currency": "USD", "value": 95000}, 95000, 95000),
+    ([{"value": {"minValue": 1, "maxValue": 2}}], 1, 2),
+])
+def test_base_salary(base_salary, low, high):
+    job = from_json_ld(dict(POSTING, baseSalary=base_salary))
+    assert (job['salary_low'], job['salary_high']) == (low, high)
+
+
+def test_loosely_shaped_fields():
+    job = from_json_ld(dict(
+        POSTING,
+        hiringOrganization="Acme",
+        jobLocation=[{"address": "Remote, US"}, {"address": [{"addressLocality": "Austin", "addressRegion": "TX"}]}],
+        identifier={"name": "Acme", "value": "DS-7"},
+        skills="Python, Spark",
+    ))
+    assert job['company'] == 'Acme'
+    assert job['location'] == 'Remote, US; Austin, TX'
+    assert job['id'] == 'DS-7'
+    assert job['listed_skills'] == ['Python', 'Spark']
+
+
+def test_telecommute_without_location():
+    posting = {k: v for k, v in POSTING.items() if k != 'jobLocation'}
+    assert from_json_ld(dict(posting, jobLocationType="TELECOMMUTE"))['location'] == 'Remote'
+
+
+@pytest.mark.parametrize("block", [
+    {k: v for k, v in POSTING.items() if k != 'title'},
+    {k: v for k, v in POSTING.items() if k != 'description'},
+    dict(POSTING, title=""),
+])
+def test_thin_blocks_fall_back_to_the_model(block):
+    assert from_json_ld(block) is None
+
+
+def test_unmappable_block_falls_back_to_the_model(monkeypatch):
+    def broken(posting, url):
+        raise TypeError("unexpected shape")
+    monkeypatch.setattr(BedrockExtractor, '_map_job_posting', staticmethod(broken))
+    assert from_json_ld(POSTING) is None
+
+
+def test_unparseable_salary_is_null():
+    job = from_json_ld(dict(POSTING, baseSalary={"value": {"minValue": "competitive", "maxValue": {"x": 1}}}))
+    assert (job['salary_low'], job['salary_high']) == (None, None)
+
+
+def test_page_without_json_ld():
+    assert BedrockExtractor._from_json_ld("<html><body>No structured data</body></html>", URL) is None
+
+
+def test_malformed_json_ld_is_skipped():
+    html = '<script type="application/ld+json">{not json</script>' + page(POSTING)
+    assert BedrockExtractor._from_json_ld(html, URL)['title'] == 'Data Scientist'
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'DATA_DIR', tmp_path)
+    return BedrockExtractor()
+
+
+def test_prepare_answers_json_ld_locally(extractor):
+    result, text, cache_path = extractor._prepare({'url': URL, 'html_content': page(POSTING)})
+    assert result['title'] == 'Data Scientist'
+    assert text is None and cache_path is None
+
+
+def test_prepare_sends_thin_json_ld_to_the_model(extractor):
+    posting = {k: v for k, v in POSTING.items() if k != 'description'}
+    result, text, cache_path = extractor._prepare({'url': URL, 'html_content': page(posting)})
+    assert result is None
+    assert text == 'Data Scientist'
+    assert cache_path.parent == extractor.cache_dir
+
+
+def test_clean_html_unescapes_entity_encoded_content():
+    # Greenhouse API "content" field
+    content = "&lt;h2&gt;About&lt;/h2&gt;&lt;p&gt;Python &amp;amp; SQL&lt;/p&gt;&lt;script&gt;x()&lt;/script&gt;"
+    assert BedrockExtractor._clean_html(content) == "About Python & SQL"
+
+
+def test_clean_html_keeps_escaped_markup_in_html_as_text():
+    content = "<p>Wrap each card in a &lt;div&gt; &amp; style it</p><script>track()</script>"
+    assert BedrockExtractor._clean_html(content) == "Wrap each card in a <div> & style it"
+
+
+def test_clean_html_plain_text():
+    assert BedrockExtractor._clean_html("  Python,\n SQL  ") == "Python, SQL"
+
+
+class StubBedrock:
+    """Bedrock runtime client that answers with fixed text, optionally refusing to stream"""
+
+    def __init__(self, text, stream_denied=False):
+        self.text = text
+        self.stream_denied = stream_denied
+        self.calls = []
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        self.calls.append('stream')
+        if self.stream_denied:
+            raise ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': 'not authorized'}},
+                              'InvokeModelWithResponseStream')
+        half = len(self.text) // 2
+        events = [{'chunk': {'bytes': json_dumps({'type': 'message_start'})}}] + [
+            {'chunk': {'bytes': json_dumps({'type': 'content_block_delta', 'delta': {'text': part}})}}
+            for part in (self.text[:half], self.text[half:])
+        ]
+        return {'body': Stream(events)}
+
+    def invoke_model(self, modelId, body):
+        self.calls.append('invoke')
+        return {'body': io.BytesIO(json_dumps({'content': [{'type': 'text', 'text': self.text}]}))}
+
+
+class Stream(list):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_invoke_streams_by_default(extractor):
+    extractor.bedrock = StubBedrock('{"title": "Data Scientist"}')
+    assert extractor._invoke("prompt") == '{"title": "Data Scientist"}'
+    assert extractor.bedrock.calls == ['stream']
+
+
+def test_invoke_falls_back_when_streaming_is_denied(extractor):
+    extractor.bedrock = StubBedrock('{"title": "Data Scientist"}', stream_denied=True)
+    assert extractor._invoke("prompt") == '{"title": "Data Scientist"}'
+    assert extractor._invoke("prompt") == '{"title": "Data Scientist"}'
+    # The denied streaming call is not retried on later prompts
+    assert extractor.bedrock.calls == ['stream', 'invoke', 'invoke']
+
+
+def test_invoke_raises_other_client_errors(extractor):
+    class Throttled(StubBedrock):
+        def invoke_model_with_response_stream(self, modelId, body):
+            raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}},
+                              'InvokeModelWithResponseStream')
+
+    extractor.bedrock = Throttled('{}')
+    with pytest.raises(ClientError):
+        extractor._invoke("prompt")
+    assert extractor.stream_responses
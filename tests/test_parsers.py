@@ -0,0 +1,44 @@
+"""
+Tests for src.parsers
+"""
+from src.parsers.skill_extractor import SkillExtractor
+
+
+def extract(text):
+    return set(SkillExtractor.extract(text))
+
+
+def test_javascript_does_not_also_match_java():
+    assert extract("Strong JavaScript experience") == {"JavaScript"}
+
+
+def test_java_and_javascript_both_listed():
+    assert extract("Java or JavaScript") == {"Java", "JavaScript"}
+
+
+def test_short_names_are_word_bounded():
+    # "R" inside "React"/"Rust" and "Go" inside "Google"/"ago" are not skills
+    assert extract("React, Rust and Google, founded years ago") == set()
+    assert extract("Fluent in R and Go") == {"R", "Go"}
+
+
+def test_names_with_regex_metacharacters():
+    assert extract("C++ and A/B Testing") == {"C++", "A/B Testing"}
+    # "C++" must not match plain "C", nor "A/B Testing" a different separator
+    assert extract("C and A-B Testing") == set()
+
+
+def test_case_insensitive_returns_canonical_names():
+    assert extract("python, SQL and pyTorch") == {"Python", "SQL", "PyTorch"}
+
+
+def test_multi_word_skills():
+    assert extract("machine learning and Power BI dashboards") == {"Machine Learning", "Power BI"}
+
+
+def test_each_skill_reported_once():
+    assert sorted(SkillExtractor.extract("Python python PYTHON")) == ["Python"]
+
+
+def test_no_skills():
+    assert SkillExtractor.extract("") == []
@@ -0,0 +1,114 @@
+"""
+Tests for src.storage.s3_manager
+"""
+import gzip
+import io
+
+import pytest
+from botocore.response import StreamingBody
+
+from config import settings
+from src.storage import s3_manager
+from src.storage.s3_manager import GZIP_JSON_ARGS, S3Manager
+from src.utils.helpers import json_loads
+
+
+class StubS3Client:
+    """In-memory stand-in for the two S3 client calls S3Manager makes"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None):
+        self.objects[(bucket, key)] = (fileobj.read(), ExtraArgs)
+
+    def get_object(self, Bucket, Key):
+        data, _ = self.objects[(Bucket, Key)]
+        return {'Body': StreamingBody(io.BytesIO(data), len(data))}
+
+
+@pytest.fixture
+def s3(monkeypatch, tmp_path):
+    client = StubS3Client()
+    monkeypatch.setattr(s3_manager, 'get_s3_client', lambda: client)
+    monkeypatch.setattr(settings, 'S3_BUCKET_NAME', 'test-bucket')
+    monkeypatch.setattr(settings, 'RAW_DATA_DIR', tmp_path / 'raw')
+    monkeypatch.setattr(settings, 'PROCESSED_DATA_DIR', tmp_path / 'processed')
+    # upload_jobs reads S3_JOBS_PREFIX, which Settings does not define
+    monkeypatch.setattr(settings, 'S3_JOBS_PREFIX', 'jobs/', raising=False)
+    return S3Manager()
+
+
+LINKS = {
+    "greenhouse": ["https://boards.greenhouse.io/acme/jobs/1", "https://boards.greenhouse.io/acme/jobs/2"],
+    "wellfound": ["https://wellfound.com/jobs/3-data-scientist"],
+}
+
+
+def test_links_round_trip(s3):
+    keys = s3.upload_individual_links(LINKS, "Data Scientist", "New York")
+    assert len(keys) == 1
+    assert keys[0].startswith(f"{settings.S3_LINKS_PREFIX}batch_data_scientist_new_york_")
+    assert keys[0].endswith(".jsonl")
+    assert s3.download_all_links(keys) == [url for urls in LINKS.values() for url in urls]
+
+
+def test_links_batch_is_json_lines(s3):
+    key, = s3.upload_individual_links(LINKS, "Data Scientist", "New York")
+    data, _ = s3.s3_client.objects[('test-bucket', key)]
+    records = [json_loads(line) for line in data.splitlines()]
+    assert [(r['source'], r['url']) for r in records] == [
+        (source, url) for source, urls in LINKS.items() for url in urls
+    ]
+    assert all(r['scraped_at'] for r in records)
+
+
+def test_links_keep_local_copy(s3):
+    key, = s3.upload_individual_links(LINKS, "Data Scientist", "New York", keep_local=True)
+    local, = (settings.RAW_DATA_DIR).iterdir()
+    assert local.read_bytes() == s3.s3_client.objects[('test-bucket', key)][0]
+
+
+def test_empty_links_round_trip(s3):
+    keys = s3.upload_individual_links({"greenhouse": []}, "", "")
+    assert s3.download_all_links(keys) == []
+
+
+def test_download_skips_missing_batches(s3):
+    key, = s3.upload_individual_links(LINKS, "Data Scientist", "New York")
+    assert s3.download_all_links(["job-links/missing.jsonl", key]) == LINKS["greenhouse"] + LINKS["wellfound"]
+
+
+RAW_JOBS = [
+    {"url": "https://boards.greenhouse.io/acme/jobs/1", "html_content": "<h1>Data Scientist</h1>" * 50},
+    {"url": "https://boards.greenhouse.io/acme/jobs/2", "html_content": "<h1>Développeur</h1>"},
+]
+
+
+def test_raw_jobs_round_trip(s3):
+    key = s3.upload_raw_jobs(RAW_JOBS, "Data Scientist", "New York")
+    assert key.startswith("raw-jobs/") and key.endswith(".json.gz")
+    assert s3.download_raw_jobs(key) == RAW_JOBS
+
+
+def test_raw_jobs_are_gzipped_json(s3):
+    key = s3.upload_raw_jobs(RAW_JOBS, "Data Scientist", "New York")
+    data, extra_args = s3.s3_client.objects[('test-bucket', key)]
+    assert extra_args == GZIP_JSON_ARGS
+    assert json_loads(gzip.decompress(data)) == RAW_JOBS
+
+
+def test_download_raw_jobs_reads_uncompressed_uploads(s3):
+    s3.s3_client.objects[('test-bucket', 'raw-jobs/old.json')] = (b'[{"url": "u"}]', None)
+    assert s3.download_raw_jobs('raw-jobs/old.json') == [{"url": "u"}]
+
+
+def test_processed_jobs_are_gzipped_json(s3):
+    jobs = [{"title": "Data Scientist", "salary_low": 120000, "listed_skills": ["Python"]}]
+    key = s3.upload_jobs(jobs, "Data Scientist", "New York", keep_local=True)
+    assert key.startswith(settings.S3_JOBS_PREFIX) and key.endswith(".json.gz")
+    data, extra_args = s3.s3_client.objects[('test-bucket', key)]
+    assert extra_args == GZIP_JSON_ARGS
+    assert json_loads(gzip.decompress(data)) == jobs
+    local, = settings.PROCESSED_DATA_DIR.iterdir()
+    assert local.read_bytes() == data
@@ -0,0 +1,166 @@
+"""
+Tests for src.scrapers.greenhouse_scraper
+"""
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from config import settings
+from src.scrapers import greenhouse_scraper
+from src.scrapers.greenhouse_scraper import GreenhouseScraper
+
+BOARDS = {
+    "acme": [
+        {"title": "Data Scientist", "location": {"name": "New York, NY"},
+         "absolute_url": "https://boards.greenhouse.io/acme/jobs/1"},
+        {"title": "Senior Data Scientist", "location": {"name": "Remote - US"},
+         "absolute_url": "https://boards.greenhouse.io/acme/jobs/2"},
+        {"title": "Data Scientist", "location": {"name": "London, UK"},
+         "absolute_url": "https://boards.greenhouse.io/acme/jobs/3"},
+        {"title": "Backend Engineer", "location": {"name": "New York, NY"},
+         "absolute_url": "https://boards.greenhouse.io/acme/jobs/4"},
+    ],
+    # Cross-listed posting and a link that is not a Greenhouse URL
+    "beta": [
+        {"title": "Data Scientist", "location": {"name": "New York, NY"},
+         "absolute_url": "https://boards.greenhouse.io/acme/jobs/1"},
+        {"title": "Data Scientist", "location": {"name": "Brooklyn, New York"},
+         "absolute_url": "https://beta.example.com/careers/5"},
+    ],
+}
+
+
+class Board:
+    """Mock Greenhouse boards API that records requests and can answer with ETags"""
+
+    def __init__(self, boards=BOARDS):
+        self.boards = boards
+        self.requests = []
+        self.responses = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.responses:
+            return self.responses.pop(0)
+        parts = request.url.path.split('/')
+        company = parts[3]
+        if len(parts) > 5:
+            return httpx.Response(200, json={
+                "id": int(parts[5]), "title": "Data Scientist", "location": {"name": "New York, NY"},
+                "updated_at": "2025-10-01T09:00:00-04:00", "content": "&lt;p&gt;Python&lt;/p&gt;",
+            })
+        if company not in self.boards:
+            return httpx.Response(404)
+        if request.headers.get('if-none-match') == f'"{company}-v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={'etag': f'"{company}-v1"'}, json={"jobs": self.boards[company]})
+
+
+@pytest.fixture
+def board():
+    return Board()
+
+
+@pytest.fixture
+def scraper(board, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'DATA_DIR', tmp_path)
+    scraper = GreenhouseScraper()
+    scraper.client = httpx.AsyncClient(transport=httpx.MockTransport(board))
+    scraper.companies = ["acme", "beta", "missing"]
+    return scraper
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def job_urls(scraper, *args):
+    return sorted(run(scraper.get_all_job_urls(*args)))
+
+
+def test_title_filter_without_location(scraper):
+    assert job_urls(scraper, "data scientist", "") == [
+        "https://boards.greenhouse.io/acme/jobs/1",
+        "https://boards.greenhouse.io/acme/jobs/2",
+        "https://boards.greenhouse.io/acme/jobs/3",
+    ]
+
+
+def test_flexible_location_accepts_remote(scraper):
+    assert job_urls(scraper, "Data Scientist", "New York") == [
+        "https://boards.greenhouse.io/acme/jobs/1",
+        "https://boards.greenhouse.io/acme/jobs/2",
+    ]
+
+
+def test_strict_location(scraper):
+    assert job_urls(scraper, "data scientist", "new york, ny", True) == [
+        "https://boards.greenhouse.io/acme/jobs/1",
+    ]
+
+
+def test_fresh_board_cache_skips_the_request(scraper, board):
+    first = job_urls(scraper, "data scientist", "")
+    requests = len(board.requests)
+    assert job_urls(scraper, "data scientist", "") == first
+    # Only the board that could not be fetched (404) is asked again
+    assert len(board.requests) == requests + 1
+
+
+def test_stale_board_cache_is_revalidated(scraper, board):
+    first = job_urls(scraper, "data scientist", "")
+    for path in scraper.cache_dir.glob('*.json'):
+        os.utime(path, (0, 0))
+    board.requests.clear()
+    assert job_urls(scraper, "data scientist", "") == first
+    acme, = [r for r in board.requests if r.url.path.endswith('/acme/jobs')]
+    assert acme.headers['if-none-match'] == '"acme-v1"'
+
+
+def test_retries_rate_limited_requests(scraper, board, monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(greenhouse_scraper.asyncio, 'sleep', sleep)
+    scraper.companies = ["acme"]
+    board.responses = [httpx.Response(429, headers={'retry-after': '7'}), httpx.Response(503)]
+    assert len(job_urls(scraper, "data scientist", "")) == 3
+    assert len(board.requests) == 3
+    assert delays[0] == 7
+    assert 2 <= delays[1] <= greenhouse_scraper.MAX_RETRY_DELAY
+
+
+def test_gives_up_after_max_retries(scraper, board, monkeypatch):
+    async def sleep(delay):
+        pass
+
+    monkeypatch.setattr(greenhouse_scraper.asyncio, 'sleep', sleep)
+    scraper.companies = ["acme"]
+    board.responses = [httpx.Response(503)] * (greenhouse_scraper.MAX_RETRIES + 1)
+    assert job_urls(scraper, "data scientist", "") == []
+    assert len(board.requests) == greenhouse_scraper.MAX_RETRIES + 1
+
+
+def test_parse_job(scraper):
+    job = run(scraper.parse_job("https://boards.greenhouse.io/acme-corp/jobs/42"))
+    assert job == {
+        "id": "42",
+        "title": "Data Scientist",
+        "company": "Acme Corp",
+        "location": "New York, NY",
+        "url": "https://boards.greenhouse.io/acme-corp/jobs/42",
+        "date_posted": "2025-10-01T09:00:00-04:00",
+        "salary_low": None,
+        "salary_high": None,
+        "description": "&lt;p&gt;Python&lt;/p&gt;",
+        "listed_skills": [],
+    }
+
+
+def test_parse_job_rejects_other_urls(scraper, board):
+    assert run(scraper.parse_job("https://wellfound.com/jobs/42")) is None
+    assert board.requests == []